@@ -11,7 +11,9 @@ Usage:
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 # Configuration: Source directories mapped to destination folders
 SOURCE_MAPPING = {
@@ -43,14 +45,25 @@ SOURCE_MAPPING = {
 # Base destination path for code examples
 DEST_BASE = "/Users/mark/Documents/GitHub/Fine Tuning/FineTuning/code_examples"
 
-def find_swift_files(source_dir: str) -> list[Path]:
+# Copies are I/O bound; a few threads overlap syscalls without thrashing the disk
+COPY_WORKERS = 8
+
+def scan_swift_files(directory: str):
+    """Yield paths of Swift files under a directory using os.scandir."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_swift_files(entry.path)
+            elif entry.name.endswith(".swift"):
+                yield entry.path
+
+def find_swift_files(source_dir: str) -> list[str]:
     """Find all Swift files in a directory recursively."""
-    source_path = Path(source_dir)
-    if not source_path.exists():
+    if not os.path.exists(source_dir):
         print(f"  ⚠️  Source directory not found: {source_dir}")
         return []
     
-    swift_files = list(source_path.rglob("*.swift"))
+    swift_files = list(scan_swift_files(source_dir))
     
     # Filter out common non-example files
     excluded_patterns = [
@@ -60,13 +73,41 @@ def find_swift_files(source_dir: str) -> list[Path]:
     ]
     
     filtered_files = []
-    for f in swift_files:
-        path_str = str(f)
+    for path_str in swift_files:
         if not any(excl in path_str for excl in excluded_patterns):
-            filtered_files.append(f)
+            filtered_files.append(path_str)
     
     return filtered_files
 
+def fast_copy(src: str, dst: Path) -> None:
+    """Copy a file and its metadata like shutil.copy2, in-kernel where possible."""
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass  # e.g. cross-filesystem on older kernels; copy2 rewrites dst
+    
+    # copy2 already uses fcopyfile on macOS and sendfile on Linux
+    shutil.copy2(src, dst)
+
+def copy_one(swift_file: str, dest_file: Path) -> tuple[str, Optional[Exception]]:
+    """Copy one file; returns (status, error)."""
+    try:
+        fast_copy(swift_file, dest_file)
+        return "copied", None
+    
+    except Exception as e:
+        return "error", e
+
 def copy_files():
     """Copy all Swift files from source directories to destination."""
     
@@ -77,43 +118,52 @@ def copy_files():
     print("Copying Swift Code Examples for Fine Tuning")
     print("=" * 60)
     
-    for dest_folder, source_dirs in SOURCE_MAPPING.items():
-        print(f"\n📁 Processing: {dest_folder}")
-        print("-" * 40)
-        
-        dest_path = Path(DEST_BASE) / dest_folder
-        dest_path.mkdir(parents=True, exist_ok=True)
-        
-        folder_count = 0
-        
-        for source_dir in source_dirs:
-            print(f"  📂 Source: {source_dir}")
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+        for dest_folder, source_dirs in SOURCE_MAPPING.items():
+            print(f"\n📁 Processing: {dest_folder}")
+            print("-" * 40)
+            
+            dest_path = Path(DEST_BASE) / dest_folder
+            dest_path.mkdir(parents=True, exist_ok=True)
+            
+            folder_count = 0
             
-            swift_files = find_swift_files(source_dir)
-            print(f"     Found {len(swift_files)} Swift files")
+            # One directory listing replaces a stat per file. Names already on
+            # disk, or seen earlier in this folder, are skipped as existing.
+            with os.scandir(dest_path) as entries:
+                claimed = {entry.name for entry in entries}
             
-            for swift_file in swift_files:
-                try:
-                    # Create destination filename
-                    dest_file = dest_path / swift_file.name
-                    
-                    # Check if file already exists
-                    if dest_file.exists():
-                        print(f"     ⏭️  Skipped (exists): {swift_file.name}")
-                        total_skipped += 1
+            # Copies are queued as soon as each source is scanned, so they
+            # overlap the scan of the next source directory
+            jobs = []
+            for source_dir in source_dirs:
+                print(f"  📂 Source: {source_dir}")
+                
+                swift_files = find_swift_files(source_dir)
+                print(f"     Found {len(swift_files)} Swift files")
+                
+                for swift_file in swift_files:
+                    file_name = os.path.basename(swift_file)
+                    if file_name in claimed:
+                        jobs.append((file_name, None))
                         continue
-                    
-                    # Copy the file
-                    shutil.copy2(swift_file, dest_file)
-                    print(f"     ✅ Copied: {swift_file.name}")
-                    
+                    claimed.add(file_name)
+                    jobs.append((file_name, executor.submit(copy_one, swift_file, dest_path / file_name)))
+            
+            for file_name, job in jobs:
+                status, error = job.result() if job else ("skipped", None)
+                
+                if status == "skipped":
+                    print(f"     ⏭️  Skipped (exists): {file_name}")
+                    total_skipped += 1
+                elif status == "copied":
+                    print(f"     ✅ Copied: {file_name}")
                     folder_count += 1
                     total_copied += 1
-                    
-                except Exception as e:
-                    print(f"     ❌ Error copying {swift_file.name}: {e}")
-        
-        print(f"  📊 Copied {folder_count} files for {dest_folder}")
+                else:
+                    print(f"     ❌ Error copying {file_name}: {error}")
+            
+            print(f"  📊 Copied {folder_count} files for {dest_folder}")
     
     print("\n" + "=" * 60)
     print("SUMMARY")
@@ -3,30 +3,48 @@ import os
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 kb_path = Path('RAG/swiftui_knowledge_base')
 code_examples_path = Path('FineTuning/code_examples')
 output_file = Path('FineTuning/swiftui_finetune_dataset.jsonl')
 
-data = []
-paths_to_walk = [kb_path, code_examples_path]
-for path in paths_to_walk:
-    for root, dirs, files in os.walk(path):
-        for file in files:
-            if file.endswith(('.md', '.swift')):
-                file_path = Path(root) / file
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                    if content:
-                        # Simple text format for fine-tuning
-                        data.append({
-                            'text': f'Instruction: Answer SwiftUI questions based on documentation.\n\nDocumentation: {content[:2000]}\n\nResponse: Here is the SwiftUI information: {content[:1000]}'
-                        })
-                except Exception as e:
-                    print(f'Error: {e}')
+TEXT_TEMPLATE = 'Instruction: Answer SwiftUI questions based on documentation.\n\nDocumentation: %s\n\nResponse: Here is the SwiftUI information: %s'
 
-with open(output_file, 'w') as f:
-    for item in data:
-        f.write(json.dumps(item) + '\n')
+# Stream each record straight to a 64KB-buffered file, batching encoded rows
+# to avoid a write per line; only one file's content is held at a time
+count = 0
+batch = bytearray()
+paths_to_walk = [kb_path, code_examples_path]
+with open(output_file, 'wb', buffering=64 * 1024) as out:
+    for path in paths_to_walk:
+        for root, dirs, files in os.walk(path):
+            for file in files:
+                if file.endswith(('.md', '.swift')):
+                    file_path = os.path.join(root, file)
+                    try:
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            content = f.read().strip()
+                        if content:
+                            # Simple text format for fine-tuning; the short head is
+                            # cut from the long one rather than from the whole file
+                            head2000 = content[:2000]
+                            head1000 = head2000[:1000]
+                            item = {'text': TEXT_TEMPLATE % (head2000, head1000)}
+                            if orjson is not None:
+                                batch += orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+                            else:
+                                batch += (json.dumps(item) + '\n').encode('utf-8')
+                            count += 1
+                            if count % 1000 == 0:
+                                out.write(batch)
+                                batch.clear()
+                    except Exception as e:
+                        print(f'Error: {e}')
+    if batch:
+        out.write(batch)
 
-print(f'Created dataset with {len(data)} examples')
\ No newline at end of file
+print(f'Created dataset with {count} examples')
\ No newline at end of file
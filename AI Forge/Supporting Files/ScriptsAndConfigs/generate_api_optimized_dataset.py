@@ -16,15 +16,71 @@ Outputs (written to FineTuning/data):
 - optimized_test_dataset.jsonl
 """
 
+import functools
 import json
+import mmap
+import os
 import random
 import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 
 MIN_IOS_VERSION: Tuple[int, int] = (17, 0)
+JSONL_BUFFER_SIZE = 64 * 1024
+
+_TYPE_DECL_RE = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(actor|class|struct|enum|protocol)\s+(\w+)")
+_FUNC_DECL_RE = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?func\s+(\w+)")
+_INIT_DECL_RE = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?init\b")
+_PROP_DECL_RE = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?(var|let)\s+(\w+)")
+_IOS_DIRECT_RE = re.compile(r"iOS\s+([0-9]+(?:\.[0-9]+)?)")
+_INTRODUCED_RE = re.compile(r"introduced:\s*([0-9]+(?:\.[0-9]+)?)")
+_DOC_BLANK_RE = re.compile(r"\n{3,}")
+# Byte-level counterpart of the two iOS availability patterns, used to skip whole files
+_IOS_MAJOR_BYTES_RE = re.compile(rb"(?:iOS\s+|introduced:\s*)([0-9]+)")
+
+# Row layouts for the JSONL writer; "input" is always empty for API rows
+_ROW_TEMPLATE = '{"instruction": %s, "input": "", "output": %s}\n'
+_ROW_PREFIX = b'{"instruction":'
+_ROW_MIDDLE = b',"input":"","output":'
+_ROW_SUFFIX = b'}\n'
+
+_OUTPUT_TEMPLATE = "{doc}Declaration:\n```swift\n{sig}\n```\n\nAvailability: {avail}{member}\nSource: {src}"
+
+_TYPE_TEMPLATES = (
+    "Explain the {kind} {base} for {avail}.",
+    "Show the Swift declaration and summary for {base} on {avail}.",
+)
+TEMPLATES_BY_KIND = {
+    **dict.fromkeys(("class", "struct", "enum", "actor", "protocol"), _TYPE_TEMPLATES),
+    "func": (
+        "How do I use {base}() on {avail}?",
+        "Describe the purpose of {base} and show its declaration for {avail}.",
+    ),
+    "property": (
+        "What does {base} provide on {avail}?",
+        "Document the property {base} for {avail}.",
+    ),
+}
+
+LEADING_MODIFIERS = frozenset({
+    "nonisolated",
+    "inlinable",
+    "convenience",
+    "mutating",
+    "consuming",
+    "borrowing",
+    "isolated",
+    "rethrows",
+})
 
 
 @dataclass
@@ -48,6 +104,10 @@ class ApiElement:
         return self.name
 
 
+# One instruction/output pair; lighter than a dict per row
+Example = namedtuple("Example", "instruction output")
+
+
 def version_to_tuple(text: str) -> Tuple[int, int]:
     """Convert a version string like '17.2' into a tuple for comparison."""
 
@@ -82,13 +142,13 @@ def parse_ios_availability(avail_lines: List[str]) -> Tuple[Optional[Tuple[int,
             deprecated = True
 
         # Pattern 1: @available(iOS 17.0, macOS 14.0, *)
-        direct = re.search(r"iOS\s+([0-9]+(?:\.[0-9]+)?)", line)
+        direct = _IOS_DIRECT_RE.search(line)
         if direct:
             introduced = version_to_tuple(direct.group(1))
             continue
 
         # Pattern 2: @available(iOS, introduced: 17.0, deprecated: 18.0)
-        introduced_match = re.search(r"introduced:\s*([0-9]+(?:\.[0-9]+)?)", line)
+        introduced_match = _INTRODUCED_RE.search(line)
         if introduced_match:
             introduced = version_to_tuple(introduced_match.group(1))
 
@@ -104,7 +164,7 @@ def clean_doc_lines(doc_lines: List[str]) -> str:
         cleaned.append(content)
 
     doc = "\n".join(cleaned).strip()
-    doc = re.sub(r"\n{3,}", "\n\n", doc)
+    doc = _DOC_BLANK_RE.sub("\n\n", doc)
     return doc
 
 
@@ -112,107 +172,143 @@ def normalize_line(line: str) -> str:
     """Drop leading attributes so regexes can match declarations."""
 
     stripped = line.strip()
-    while stripped.startswith("@") and " " in stripped:
-        stripped = stripped.split(" ", 1)[1].strip()
-
-    leading_modifiers = {
-        "nonisolated",
-        "inlinable",
-        "convenience",
-        "mutating",
-        "consuming",
-        "borrowing",
-        "isolated",
-        "rethrows",
-    }
+    length = len(stripped)
+    i = 0
+
+    # Walk past "@Attribute " prefixes without building intermediate strings
+    while stripped.startswith("@", i):
+        space = stripped.find(" ", i)
+        if space == -1:
+            break
+        i = space + 1
+        while i < length and stripped[i].isspace():
+            i += 1
+
     while True:
-        parts = stripped.split(" ", 1)
-        if parts and parts[0] in leading_modifiers:
-            stripped = parts[1] if len(parts) > 1 else ""
-            continue
-        break
-    return stripped
+        space = stripped.find(" ", i)
+        end = length if space == -1 else space
+        if stripped[i:end] not in LEADING_MODIFIERS:
+            break
+        i = end + 1 if space != -1 else length
+    return stripped[i:]
+
+
+def may_have_eligible_apis(data: bytes) -> bool:
+    """Cheap whole-file test: does any annotation name a recent enough iOS major version?"""
+
+    min_major = MIN_IOS_VERSION[0]
+    for match in _IOS_MAJOR_BYTES_RE.finditer(data):
+        if int(match.group(1)) >= min_major:
+            return True
+    return False
+
+
+def iter_mapped_lines(path: Path, prefilter: Optional[Callable[[bytes], bool]] = None) -> Iterator[bytes]:
+    """Yield raw lines from a read-only memory map of the file.
+
+    When a prefilter is given and rejects the mapped contents, nothing is yielded.
+    """
+
+    with open(path, "rb") as fh:
+        # mmap refuses zero-length files
+        if os.fstat(fh.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if prefilter is not None and not prefilter(mm):
+                return
+            size = len(mm)
+            start = 0
+            while start < size:
+                newline = mm.find(b"\n", start)
+                if newline == -1:
+                    newline = size
+                yield mm[start:newline]
+                start = newline + 1
 
 
 def extract_api_elements(swift_file: Path) -> List[ApiElement]:
     elements: List[ApiElement] = []
-    text = swift_file.read_text(encoding="utf-8")
-    lines = text.splitlines()
 
     doc_lines: List[str] = []
     avail_lines: List[str] = []
     type_stack: List[Tuple[str, int]] = []  # (type_name, depth)
     brace_depth = 0
 
-    type_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(actor|class|struct|enum|protocol)\s+(\w+)")
-    func_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?func\s+(\w+)")
-    init_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?init\b")
-    prop_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?(var|let)\s+(\w+)")
-
-    for line in lines:
-        stripped = line.strip()
-
-        if stripped.startswith("///"):
-            doc_lines.append(stripped)
+    # Files with no iOS 17+ annotation cannot yield elements and are skipped unparsed.
+    # Lines stay as bytes until a prefix check shows they are worth decoding.
+    for raw in iter_mapped_lines(swift_file, may_have_eligible_apis):
+        stripped_raw = raw.strip()
+        if not stripped_raw:
             continue
 
-        if stripped.startswith("@available"):
-            avail_lines.append(stripped)
+        if stripped_raw.startswith(b"///"):
+            doc_lines.append(stripped_raw.decode("utf-8"))
             continue
 
-        normalized = normalize_line(stripped)
-
-        type_match = type_decl_re.match(normalized)
-        func_match = func_decl_re.match(normalized)
-        prop_match = prop_decl_re.match(normalized)
+        if stripped_raw.startswith(b"@available"):
+            avail_lines.append(stripped_raw.decode("utf-8"))
+            continue
 
+        type_match = None
         element_kind: Optional[str] = None
         element_name: Optional[str] = None
 
-        if type_match:
-            element_kind = type_match.group(2)
-            element_name = type_match.group(3)
-        elif func_match:
-            element_kind = "func"
-            element_name = func_match.group(3)
-        elif init_decl_re.match(normalized):
-            element_kind = "func"
-            element_name = "init"
-        elif prop_match:
-            element_kind = "property"
-            element_name = prop_match.group(4)
-
-        if element_kind and element_name:
-            parent_type = type_stack[-1][0] if type_stack else None
-            introduced, deprecated, unavailable = parse_ios_availability(avail_lines)
-
-            if is_version_at_least(introduced, MIN_IOS_VERSION) and not deprecated and not unavailable:
-                doc = clean_doc_lines(doc_lines)
-                signature_lines = [ln.strip() for ln in avail_lines] if avail_lines else []
-                signature_lines.append(stripped)
-                signature = "\n".join(signature_lines)
-
-                elements.append(
-                    ApiElement(
-                        name=element_name,
-                        kind=element_kind,
-                        signature=signature,
-                        doc=doc,
-                        ios_introduced=introduced,
-                        deprecated=deprecated,
-                        unavailable=unavailable,
-                        source_file=swift_file,
-                        parent_type=parent_type,
+        # Declarations begin with a keyword or an attribute; braces and comments never match
+        if stripped_raw[:1].isalpha() or stripped_raw.startswith(b"@"):
+            stripped = stripped_raw.decode("utf-8")
+            normalized = normalize_line(stripped)
+
+            # Try the patterns in precedence order and stop at the first hit
+            type_match = _TYPE_DECL_RE.match(normalized)
+            if type_match:
+                element_kind = type_match.group(2)
+                element_name = type_match.group(3)
+            else:
+                func_match = _FUNC_DECL_RE.match(normalized)
+                if func_match:
+                    element_kind = "func"
+                    element_name = func_match.group(3)
+                elif _INIT_DECL_RE.match(normalized):
+                    element_kind = "func"
+                    element_name = "init"
+                else:
+                    prop_match = _PROP_DECL_RE.match(normalized)
+                    if prop_match:
+                        element_kind = "property"
+                        element_name = prop_match.group(4)
+
+            if element_kind and element_name:
+                parent_type = type_stack[-1][0] if type_stack else None
+                introduced, deprecated, unavailable = parse_ios_availability(avail_lines)
+
+                if is_version_at_least(introduced, MIN_IOS_VERSION) and not deprecated and not unavailable:
+                    doc = clean_doc_lines(doc_lines)
+                    signature_lines = [ln.strip() for ln in avail_lines] if avail_lines else []
+                    signature_lines.append(stripped)
+                    signature = "\n".join(signature_lines)
+
+                    elements.append(
+                        ApiElement(
+                            name=element_name,
+                            kind=element_kind,
+                            signature=signature,
+                            doc=doc,
+                            ios_introduced=introduced,
+                            deprecated=deprecated,
+                            unavailable=unavailable,
+                            source_file=swift_file,
+                            parent_type=parent_type,
+                        )
                     )
-                )
 
-            doc_lines = []
-            avail_lines = []
+                doc_lines = []
+                avail_lines = []
 
-        # Update brace tracking after processing the declaration
-        open_braces = line.count("{")
-        close_braces = line.count("}")
-        brace_depth += open_braces - close_braces
+        # Update brace tracking after processing the declaration. Doc comments and
+        # @available lines were skipped above: in Apple's generated interfaces they
+        # never carry scope braces, so only code lines are counted.
+        open_braces = raw.count(b"{")
+        brace_depth += open_braces - raw.count(b"}")
 
         # Push new type context when we see a type declaration with an opening brace
         if type_match and open_braces > 0:
@@ -223,11 +319,11 @@ def extract_api_elements(swift_file: Path) -> List[ApiElement]:
             type_stack.pop()
 
         # Attribute-only lines should not wipe doc context
-        if stripped.startswith("@") and not element_kind:
+        if stripped_raw.startswith(b"@") and not element_kind:
             continue
 
         # If we encounter unrelated code, clear stray docs/availability
-        if not element_kind and stripped and not stripped.startswith("//"):
+        if not element_kind and not stripped_raw.startswith(b"//"):
             doc_lines = []
             avail_lines = []
 
@@ -236,97 +332,102 @@ def extract_api_elements(swift_file: Path) -> List[ApiElement]:
 
 def load_all_api_elements(api_dir: Path) -> List[ApiElement]:
     elements: List[ApiElement] = []
-    for swift_file in sorted(api_dir.glob("*.swift")):
-        print(f"Scanning {swift_file.name}...")
-        file_elements = extract_api_elements(swift_file)
-        print(f"  found {len(file_elements)} eligible symbols")
-        elements.extend(file_elements)
+    swift_files = sorted(api_dir.glob("*.swift"))
+
+    # Files parse independently, so fan them out across cores and report in order
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(extract_api_elements, swift_files, chunksize=8)
+        for swift_file, file_elements in zip(swift_files, results):
+            print(f"Scanning {swift_file.name}...")
+            print(f"  found {len(file_elements)} eligible symbols")
+            elements.extend(file_elements)
     return elements
 
 
-def format_availability(element: ApiElement) -> str:
-    version = element.ios_introduced
+@functools.lru_cache(maxsize=32)
+def format_version(version: Optional[Tuple[int, int]]) -> str:
     if not version:
         return "iOS 17+"
     major, minor = version
     return f"iOS {major}.{minor}+"
 
 
-def build_output_text(element: ApiElement) -> str:
-    parts = []
-    if element.doc:
-        parts.append(element.doc)
-        parts.append("")
+def format_availability(element: ApiElement) -> str:
+    return format_version(element.ios_introduced)
 
-    parts.append("Declaration:")
-    parts.append("```swift")
-    parts.append(element.signature.strip())
-    parts.append("```")
-    parts.append("")
 
-    parts.append(f"Availability: {format_availability(element)}")
-    if element.parent_type:
-        parts.append(f"Member of: {element.parent_type}")
-    parts.append(f"Source: {element.source_file.name}")
+def build_output_text(element: ApiElement, avail: str) -> str:
+    return _OUTPUT_TEMPLATE.format_map({
+        "doc": f"{element.doc}\n\n" if element.doc else "",
+        "sig": element.signature.strip(),
+        "avail": avail,
+        "member": f"\nMember of: {element.parent_type}" if element.parent_type else "",
+        "src": element.source_file.name,
+    })
 
-    return "\n".join(parts).strip()
 
+def instruction_templates(element: ApiElement) -> Tuple[str, ...]:
+    return TEMPLATES_BY_KIND.get(element.kind, TEMPLATES_BY_KIND["property"])
 
-def build_instruction_examples(element: ApiElement) -> List[dict]:
-    output = build_output_text(element)
-    base = element.full_name
+
+def build_instruction_examples(element: ApiElement) -> Iterator[Example]:
     avail = format_availability(element)
+    output = build_output_text(element, avail)
+    base = element.full_name
+
+    for template in instruction_templates(element):
+        instruction = template.format(kind=element.kind, base=base, avail=avail)
+        yield Example(instruction, output)
+
 
-    templates: List[str] = []
-    if element.kind in {"class", "struct", "enum", "actor", "protocol"}:
-        templates = [
-            f"Explain the {element.kind} {base} for {avail}.",
-            f"Show the Swift declaration and summary for {base} on {avail}.",
-        ]
-    elif element.kind == "func":
-        templates = [
-            f"How do I use {base}() on {avail}?",
-            f"Describe the purpose of {base} and show its declaration for {avail}.",
-        ]
-    else:  # property
-        templates = [
-            f"What does {base} provide on {avail}?",
-            f"Document the property {base} for {avail}.",
-        ]
-
-    return [
-        {"instruction": template, "input": "", "output": output}
-        for template in templates
-    ]
-
-
-def save_datasets(dataset: List[dict], output_dir: Path, train_ratio: float = 0.8) -> None:
+def iter_examples(elements: List[ApiElement]) -> Iterator[Example]:
+    """Stream every example in element order without materializing the dataset."""
+
+    for element in elements:
+        yield from build_instruction_examples(element)
+
+
+def dump_jsonl_row(example: Example) -> bytes:
+    """Serialize an example as one UTF-8 encoded JSONL line."""
+
+    # Only the two strings need encoding; the row layout is fixed
+    if orjson is not None:
+        dumps = orjson.dumps
+        return _ROW_PREFIX + dumps(example.instruction) + _ROW_MIDDLE + dumps(example.output) + _ROW_SUFFIX
+    dumps = json.dumps
+    return (_ROW_TEMPLATE % (
+        dumps(example.instruction, ensure_ascii=False),
+        dumps(example.output, ensure_ascii=False),
+    )).encode("utf-8")
+
+
+def save_datasets(
+    elements: List[ApiElement],
+    output_dir: Path,
+    train_ratio: float = 0.8,
+) -> None:
+    # Rows are shuffled as serialized lines so the splits are not ordered by
+    # file and member; trainers take their validation rows from the tail
     output_dir.mkdir(parents=True, exist_ok=True)
-    random.shuffle(dataset)
 
-    full_path = output_dir / "optimized_finetune_dataset.jsonl"
-    with full_path.open("w", encoding="utf-8") as f:
-        for row in dataset:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    lines = [dump_jsonl_row(example) for example in iter_examples(elements)]
+    random.shuffle(lines)
 
-    split = int(len(dataset) * train_ratio)
-    train_rows = dataset[:split]
-    test_rows = dataset[split:]
+    split = int(len(lines) * train_ratio)
+    train_lines = lines[:split]
+    test_lines = lines[split:]
 
+    full_path = output_dir / "optimized_finetune_dataset.jsonl"
     train_path = output_dir / "optimized_train_dataset.jsonl"
     test_path = output_dir / "optimized_test_dataset.jsonl"
 
-    with train_path.open("w", encoding="utf-8") as f:
-        for row in train_rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-    with test_path.open("w", encoding="utf-8") as f:
-        for row in test_rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    for path, rows in ((full_path, lines), (train_path, train_lines), (test_path, test_lines)):
+        with path.open("wb", buffering=JSONL_BUFFER_SIZE) as f:
+            f.writelines(rows)
 
-    print(f"Saved full dataset to {full_path} ({len(dataset)} rows)")
-    print(f"Saved train split to {train_path} ({len(train_rows)} rows)")
-    print(f"Saved test split to {test_path} ({len(test_rows)} rows)")
+    print(f"Saved full dataset to {full_path} ({len(lines)} rows)")
+    print(f"Saved train split to {train_path} ({len(train_lines)} rows)")
+    print(f"Saved test split to {test_path} ({len(test_lines)} rows)")
 
 
 def main() -> None:
@@ -349,12 +450,10 @@ def main() -> None:
     elements = load_all_api_elements(api_dir)
     print(f"Total eligible API elements: {len(elements)}")
 
-    dataset: List[dict] = []
-    for element in elements:
-        dataset.extend(build_instruction_examples(element))
+    total = sum(len(instruction_templates(element)) for element in elements)
 
-    print(f"Total instruction-output pairs: {len(dataset)}")
-    save_datasets(dataset, output_dir)
+    print(f"Total instruction-output pairs: {total}")
+    save_datasets(elements, output_dir)
 
 
 if __name__ == "__main__":
@@ -11,11 +11,21 @@ import os
 import re
 import json
 import random
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Iterator, Tuple, Optional
 from dataclasses import dataclass, field
 
 
+# Fixed response layouts, filled in once per example
+QUESTION_OUTPUT_TEMPLATE = "{description}Here's an example of {topic} in SwiftUI:\n\n```swift\n{code}\n```"
+FRAMEWORK_OUTPUT_TEMPLATE = "Here's an example using {framework} for {topic}:\n\n```swift\n{code}\n```"
+
+# Subtopics that add nothing to a topic name
+INTRO_SUBTOPICS = frozenset({"intro", "introduction"})
+GENERIC_SUBTOPICS = INTRO_SUBTOPICS | {"default"}
+
+
 @dataclass
 class CodeExample:
     """Represents a parsed SwiftUI code example"""
@@ -42,15 +52,19 @@ class SwiftCodeExampleParser:
             re.DOTALL
         )
         self.comment_pattern = re.compile(r'//\s*NOTE:\s*(.+)$', re.MULTILINE)
+        # Word boundaries in CamelCase: lower->Upper, and before the last
+        # capital of a run that starts a new word (e.g. "UIKit" -> "UI Kit")
+        self.camel_boundary_pattern = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])')
         
-        # Patterns for copyright/attribution comments to strip
-        self.copyright_patterns = [
-            re.compile(r'^\s*//\s*Created by.*$', re.MULTILINE),
-            re.compile(r'^\s*//\s*Copyright.*$', re.MULTILINE),
-            re.compile(r'^\s*//\s*@BigMtnStudio.*$', re.MULTILINE),
-            re.compile(r'^\s*//\s*Twitter:.*$', re.MULTILINE),
-            re.compile(r'^\s*//\s*All rights reserved.*$', re.MULTILINE),
-        ]
+        # Comment prefixes for copyright/attribution lines to strip
+        self.copyright_prefixes = (
+            "Created by",
+            "Copyright",
+            "@BigMtnStudio",
+            "Twitter:",
+            "All rights reserved",
+        )
+        self.blank_lines_pattern = re.compile(r'\n{3,}')
 
     def parse_file(self, file_path: Path, category: str) -> Optional[CodeExample]:
         """Parse a Swift file into a CodeExample"""
@@ -105,19 +119,21 @@ class SwiftCodeExampleParser:
 
     def _to_readable(self, text: str) -> str:
         """Convert CamelCase to readable text"""
-        # Insert space before capitals
-        result = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
-        # Handle consecutive capitals
-        result = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', result)
-        return result
+        # Insert a space at every word boundary in a single pass
+        return self.camel_boundary_pattern.sub(' ', text)
 
     def _strip_copyright_comments(self, code: str) -> str:
         """Remove copyright and attribution comments from code"""
-        for pattern in self.copyright_patterns:
-            code = pattern.sub('', code)
+        # One pass over the lines; matching comments become blank lines
+        lines = code.split('\n')
+        for index, line in enumerate(lines):
+            comment = line.lstrip()
+            if comment.startswith('//') and comment[2:].lstrip().startswith(self.copyright_prefixes):
+                lines[index] = ''
+        code = '\n'.join(lines)
         
         # Clean up multiple blank lines that may result from stripping
-        code = re.sub(r'\n{3,}', '\n\n', code)
+        code = self.blank_lines_pattern.sub('\n\n', code)
         
         # Remove leading blank lines
         code = code.lstrip('\n')
@@ -163,36 +179,37 @@ class InstructionGenerator:
             "What's the best way to implement {topic} in SwiftUI?",
             "How do I {subtopic} using {topic} in SwiftUI?",
         ]
-
-    def generate_examples(self, example: CodeExample) -> List[Dict[str, str]]:
-        """Generate multiple instruction-tuning examples from a code example"""
-        examples = []
+        
+        self._code_n = len(self.code_request_templates)
+        self._specific_n = len(self.specific_code_templates)
+
+    def generate_examples(self, example: CodeExample) -> Iterator[Dict[str, str]]:
+        """Yield instruction-tuning examples from a code example one at a time"""
+        randrange = random.randrange
+        topic = example.topic.lower()
+        subtopic = example.subtopic.lower()
+        topic_display = topic if subtopic in INTRO_SUBTOPICS else f"{topic} - {subtopic}"
         
         # Primary example: Direct code request with complete code response
-        examples.append(self._generate_code_example(example))
+        template = self.code_request_templates[randrange(self._code_n)]
+        yield self._generate_code_example(example, template, topic_display)
         
         # Secondary example: Question format with explanation + code
-        examples.append(self._generate_question_example(example))
+        yield self._generate_question_example(example, topic, subtopic)
         
         # Subtopic-specific example if subtopic is meaningful
-        if example.subtopic.lower() not in ["intro", "introduction", "default"]:
-            examples.append(self._generate_subtopic_example(example))
+        if subtopic not in GENERIC_SUBTOPICS:
+            template = self.specific_code_templates[randrange(self._specific_n)]
+            yield self._generate_subtopic_example(example, template, topic, subtopic)
         
         # Framework-specific example for SwiftData/Charts
         if any(imp in example.imports for imp in ["SwiftData", "Charts"]):
-            examples.append(self._generate_framework_example(example))
+            yield self._generate_framework_example(example)
 
-        return examples
-
-    def _generate_code_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_code_example(self, example: CodeExample, template: str,
+                               topic_display: str) -> Dict[str, str]:
         """Generate a direct code request example - optimized for accuracy"""
-        topic_display = f"{example.topic}"
-        if example.subtopic.lower() not in ["intro", "introduction"]:
-            topic_display = f"{example.topic} - {example.subtopic}"
-        
-        instruction = random.choice(self.code_request_templates).format(
-            topic=topic_display.lower()
-        )
+        instruction = template.format(topic=topic_display)
         
         # Output is the complete, working code
         output = f"```swift\n{example.code.strip()}\n```"
@@ -203,37 +220,33 @@ class InstructionGenerator:
             "output": output
         }
 
-    def _generate_question_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_question_example(self, example: CodeExample, topic: str,
+                                   subtopic: str) -> Dict[str, str]:
         """Generate a question-style example with explanation + code"""
         instruction = self.question_templates[0].format(
-            topic=example.topic.lower(),
-            subtopic=example.subtopic.lower()
+            topic=topic,
+            subtopic=subtopic
         )
         
         # Build response with optional description and complete code
-        parts = []
-        if example.description:
-            parts.append(example.description)
-            parts.append("")
-        
-        parts.append(f"Here's an example of {example.topic.lower()} in SwiftUI:")
-        parts.append("")
-        parts.append("```swift")
-        parts.append(example.code.strip())
-        parts.append("```")
+        output = QUESTION_OUTPUT_TEMPLATE.format(
+            description=f"{example.description}\n\n" if example.description else "",
+            topic=topic,
+            code=example.code.strip()
+        )
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": "\n".join(parts)
+            "output": output
         }
 
-    def _generate_subtopic_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_subtopic_example(self, example: CodeExample, template: str,
+                                   topic: str, subtopic: str) -> Dict[str, str]:
         """Generate a subtopic-specific example"""
-        template = random.choice(self.specific_code_templates)
         instruction = template.format(
-            topic=example.topic.lower(),
-            subtopic=example.subtopic.lower()
+            topic=topic,
+            subtopic=subtopic
         )
         
         output = f"```swift\n{example.code.strip()}\n```"
@@ -251,42 +264,58 @@ class InstructionGenerator:
         
         instruction = f"Show me how to use {framework} with {example.topic.lower()} in SwiftUI."
         
-        parts = []
-        parts.append(f"Here's an example using {framework} for {example.topic.lower()}:")
-        parts.append("")
-        parts.append("```swift")
-        parts.append(example.code.strip())
-        parts.append("```")
+        output = FRAMEWORK_OUTPUT_TEMPLATE.format(
+            framework=framework,
+            topic=example.topic.lower(),
+            code=example.code.strip()
+        )
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": "\n".join(parts)
+            "output": output
         }
 
 
+_parser: Optional[SwiftCodeExampleParser] = None
+
+
+def parse_code_example(task: Tuple[str, str]) -> Optional[CodeExample]:
+    """Parse a (file_path, category) task; top-level so process pools can pickle it"""
+    global _parser
+    if _parser is None:
+        _parser = SwiftCodeExampleParser()
+    file_path, category = task
+    return _parser.parse_file(Path(file_path), category)
+
+
 def process_code_examples_directory(base_dir: Path) -> List[CodeExample]:
     """Process all Swift files in the code examples directory"""
-    parser = SwiftCodeExampleParser()
     examples = []
     
     if not base_dir.exists():
         print(f"Directory not found: {base_dir}")
         return examples
     
-    # Walk through all subdirectories
-    for category_dir in base_dir.iterdir():
-        if not category_dir.is_dir():
-            continue
-            
+    # Walk through all subdirectories; scandir entries carry their type,
+    # so no extra stat or Path object is needed per file
+    tasks: List[Tuple[str, str]] = []
+    with os.scandir(base_dir) as category_entries:
+        category_dirs = [entry for entry in category_entries if entry.is_dir()]
+    
+    for category_dir in category_dirs:
         category = category_dir.name
         print(f"Processing category: {category}")
         
-        swift_files = list(category_dir.glob("*.swift"))
+        with os.scandir(category_dir.path) as file_entries:
+            swift_files = [entry.path for entry in file_entries if entry.name.endswith(".swift")]
         print(f"  Found {len(swift_files)} Swift files")
         
-        for swift_file in swift_files:
-            example = parser.parse_file(swift_file, category)
+        tasks.extend((swift_file, category) for swift_file in swift_files)
+    
+    # Each file parses independently, so spread the work across cores
+    with ProcessPoolExecutor() as executor:
+        for example in executor.map(parse_code_example, tasks, chunksize=8):
             if example:
                 examples.append(example)
     
@@ -298,9 +327,9 @@ def generate_dataset(examples: List[CodeExample]) -> List[Dict[str, str]]:
     generator = InstructionGenerator()
     dataset = []
     
+    # Rows are shuffled before saving, so the generator output is collected here
     for example in examples:
-        instruction_examples = generator.generate_examples(example)
-        dataset.extend(instruction_examples)
+        dataset.extend(generator.generate_examples(example))
     
     return dataset
 
@@ -15,17 +15,79 @@ Outputs:
 - data/unified_test_dataset.jsonl (test data, 20% for overfitting evaluation)
 """
 
+import functools
 import json
+import mmap
+import os
+import pickle
 import random
 import re
-from dataclasses import dataclass, field
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-
-MIN_IOS_VERSION: Tuple[int, int] = (17, 0)
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
 
 
+MIN_IOS_VERSION: Tuple[int, int] = (17, 0)
+# Bump when parsing changes so cached API elements are rebuilt
+API_CACHE_VERSION = 2
+JSONL_BUFFER_SIZE = 1 << 20
+
+# Subtopics that add nothing to a topic name
+INTRO_SUBTOPICS = frozenset({"intro", "introduction"})
+GENERIC_SUBTOPICS = INTRO_SUBTOPICS | {"default"}
+# Imports that earn a framework-specific example
+FRAMEWORK_IMPORTS = frozenset({"SwiftData", "Charts"})
+
+# Declaration and availability patterns, compiled once per process.
+# Alternatives are ordered type, func, init, property; the type branch comes before
+# the optional static/class prefix so "class func" still reads as a type declaration.
+_DECL_RE = re.compile(
+    r"^(?:public|open|internal|fileprivate|private)?\s*"
+    r"(?:(?P<kind>actor|class|struct|enum|protocol)\s+(?P<tname>\w+)"
+    r"|(?:static\s+|class\s+)?"
+    r"(?:func\s+(?P<fname>\w+)|(?P<init>init)\b|(?:var|let)\s+(?P<pname>\w+)))"
+)
+# Every _DECL_RE alternative starts with an access modifier or one of these keywords
+_DECL_PREFIXES = (
+    "public", "open", "internal", "fileprivate", "private",
+    "actor", "class", "struct", "enum", "protocol",
+    "static", "func", "init", "var", "let",
+)
+_AVAIL_RE = re.compile(
+    r"iOS\s+(?P<direct>[0-9]+(?:\.[0-9]+)?)"
+    r"|introduced:\s*(?P<intro>[0-9]+(?:\.[0-9]+)?)"
+    r"|(?P<dep>deprecated|obsoleted)"
+    r"|(?P<un>unavailable)"
+)
+_DOC_BLANK_RE = re.compile(r"\n{3,}")
+# Leading "@Attribute " prefixes (cut at the first space), then space-separated modifiers
+_LEAD_NOISE_RE = re.compile(
+    r"(?:@[^ ]* \s*)*"
+    r"(?:(?:nonisolated|inlinable|convenience|mutating|consuming|borrowing|isolated|rethrows)(?: |\Z))*"
+)
+
+
+def with_slots(cls):
+    """Rebuild a dataclass with __slots__ (dataclass(slots=True) needs Python 3.10)."""
+    cls_dict = dict(cls.__dict__)
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict["__slots__"] = field_names
+    # Defaults live in the generated __init__; class attributes would clash with the slots
+    for name in field_names:
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    return type(cls)(cls.__name__, cls.__bases__, cls_dict)
+
+
+@with_slots
 @dataclass
 class CodeExample:
     """Represents a parsed SwiftUI code example from code_examples/"""
@@ -41,6 +103,7 @@ class CodeExample:
     source_type: str = "code_example"
 
 
+@with_slots
 @dataclass
 class ApiElement:
     """Represents a parsed API element from api_training_data/"""
@@ -89,181 +152,261 @@ def parse_ios_availability(avail_lines: List[str]) -> Tuple[Optional[Tuple[int,
 
     for raw in avail_lines:
         line = raw.strip()
+        # Other platforms' deprecations must not affect iOS availability
         if "iOS" not in line:
             continue
 
-        if "unavailable" in line:
-            unavailable = True
-
-        if "deprecated" in line or "obsoleted" in line:
-            deprecated = True
-
-        direct = re.search(r"iOS\s+([0-9]+(?:\.[0-9]+)?)", line)
-        if direct:
-            introduced = version_to_tuple(direct.group(1))
-            continue
-
-        introduced_match = re.search(r"introduced:\s*([0-9]+(?:\.[0-9]+)?)", line)
-        if introduced_match:
-            introduced = version_to_tuple(introduced_match.group(1))
+        # One scan per line; "iOS X.Y" wins over "introduced: X.Y"
+        direct = None
+        introduced_text = None
+        for match in _AVAIL_RE.finditer(line):
+            group = match.lastgroup
+            if group == "direct":
+                if direct is None:
+                    direct = match.group(group)
+            elif group == "intro":
+                if introduced_text is None:
+                    introduced_text = match.group(group)
+            elif group == "dep":
+                deprecated = True
+            else:
+                unavailable = True
+
+        version_text = direct or introduced_text
+        if version_text:
+            introduced = version_to_tuple(version_text)
 
     return introduced, deprecated, unavailable
 
 
-def clean_doc_lines(doc_lines: List[str]) -> str:
-    """Strip leading /// and collapse extra blank lines."""
+def clean_doc_lines(doc_lines: List[bytes]) -> str:
+    """Decode raw /// lines, strip the slashes and collapse extra blank lines."""
     cleaned = []
     for line in doc_lines:
-        content = line.lstrip("/").strip()
+        content = line.decode("utf-8").lstrip("/").strip()
         cleaned.append(content)
 
     doc = "\n".join(cleaned).strip()
-    doc = re.sub(r"\n{3,}", "\n\n", doc)
+    doc = _DOC_BLANK_RE.sub("\n\n", doc)
     return doc
 
 
 def normalize_line(line: str) -> str:
     """Drop leading attributes and modifiers so regexes can match declarations."""
     stripped = line.strip()
-    while stripped.startswith("@") and " " in stripped:
-        stripped = stripped.split(" ", 1)[1].strip()
-
-    leading_modifiers = {
-        "nonisolated",
-        "inlinable",
-        "convenience",
-        "mutating",
-        "consuming",
-        "borrowing",
-        "isolated",
-        "rethrows",
-    }
-    while True:
-        parts = stripped.split(" ", 1)
-        if parts and parts[0] in leading_modifiers:
-            stripped = parts[1] if len(parts) > 1 else ""
-            continue
-        break
-    return stripped
+    return stripped[_LEAD_NOISE_RE.match(stripped).end():]
+
+
+def iter_mapped_lines(swift_file: Path) -> Iterator[bytes]:
+    """Yield raw lines from a read-only memory map of the file."""
+    with open(swift_file, "rb") as f:
+        # mmap refuses zero-length files
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            yield from iter(mm.readline, b"")
 
 
 def extract_api_elements(swift_file: Path) -> List[ApiElement]:
     """Parse a Swift API definition file and extract eligible elements."""
     elements: List[ApiElement] = []
-    text = swift_file.read_text(encoding="utf-8")
-    lines = text.splitlines()
 
-    doc_lines: List[str] = []
+    # Doc comments stay undecoded; most belong to declarations the filter drops
+    doc_lines: List[bytes] = []
     avail_lines: List[str] = []
     type_stack: List[Tuple[str, int]] = []
     brace_depth = 0
-
-    type_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(actor|class|struct|enum|protocol)\s+(\w+)")
-    func_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?func\s+(\w+)")
-    init_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?init\b")
-    prop_decl_re = re.compile(r"^(public|open|internal|fileprivate|private)?\s*(static\s+|class\s+)?(var|let)\s+(\w+)")
-
-    for line in lines:
-        stripped = line.strip()
-
-        if stripped.startswith("///"):
-            doc_lines.append(stripped)
+    # Repeated signatures and docs (e.g. overloads' shared docs) share one string;
+    # pickling keeps the sharing when results come back from the cache or workers
+    string_pool: Dict[str, str] = {}
+
+    # Lines stay as bytes until a prefix check shows they are worth decoding
+    for raw in iter_mapped_lines(swift_file):
+        stripped_raw = raw.strip()
+        if not stripped_raw:
             continue
 
-        if stripped.startswith("@available"):
-            avail_lines.append(stripped)
+        if stripped_raw.startswith(b"///"):
+            doc_lines.append(stripped_raw)
             continue
 
-        normalized = normalize_line(stripped)
-
-        type_match = type_decl_re.match(normalized)
-        func_match = func_decl_re.match(normalized)
-        prop_match = prop_decl_re.match(normalized)
+        if stripped_raw.startswith(b"@available"):
+            avail_lines.append(stripped_raw.decode("utf-8"))
+            continue
 
+        type_match = None
         element_kind: Optional[str] = None
         element_name: Optional[str] = None
 
-        if type_match:
-            element_kind = type_match.group(2)
-            element_name = type_match.group(3)
-        elif func_match:
-            element_kind = "func"
-            element_name = func_match.group(3)
-        elif init_decl_re.match(normalized):
-            element_kind = "func"
-            element_name = "init"
-        elif prop_match:
-            element_kind = "property"
-            element_name = prop_match.group(4)
-
-        if element_kind and element_name:
-            parent_type = type_stack[-1][0] if type_stack else None
-            introduced, deprecated, unavailable = parse_ios_availability(avail_lines)
-
-            if is_version_at_least(introduced, MIN_IOS_VERSION) and not deprecated and not unavailable:
-                doc = clean_doc_lines(doc_lines)
-                signature_lines = [ln.strip() for ln in avail_lines] if avail_lines else []
-                signature_lines.append(stripped)
-                signature = "\n".join(signature_lines)
-
-                elements.append(
-                    ApiElement(
-                        name=element_name,
-                        kind=element_kind,
-                        signature=signature,
-                        doc=doc,
-                        ios_introduced=introduced,
-                        deprecated=deprecated,
-                        unavailable=unavailable,
-                        source_file=swift_file,
-                        parent_type=parent_type,
+        # Only lines starting with a letter or an attribute can normalize to a declaration
+        if stripped_raw[:1].isalpha() or stripped_raw.startswith(b"@"):
+            stripped = stripped_raw.decode("utf-8")
+            normalized = normalize_line(stripped)
+
+            # Comments and plain statements fail this prefix test, skipping the regexes
+            if normalized.lstrip().startswith(_DECL_PREFIXES):
+                decl = _DECL_RE.match(normalized)
+                if decl:
+                    if decl.group("kind"):
+                        type_match = decl
+                        element_kind = decl.group("kind")
+                        element_name = decl.group("tname")
+                    elif decl.group("fname"):
+                        element_kind = "func"
+                        element_name = decl.group("fname")
+                    elif decl.group("init"):
+                        element_kind = "func"
+                        element_name = "init"
+                    else:
+                        element_kind = "property"
+                        element_name = decl.group("pname")
+
+            if element_kind and element_name:
+                introduced, deprecated, unavailable = parse_ios_availability(avail_lines)
+
+                # Filtered-out declarations skip all doc, signature and parent work
+                if is_version_at_least(introduced, MIN_IOS_VERSION) and not deprecated and not unavailable:
+                    parent_type = type_stack[-1][0] if type_stack else None
+                    doc = clean_doc_lines(doc_lines)
+                    doc = string_pool.setdefault(doc, doc)
+                    # avail_lines already hold stripped text
+                    signature = "\n".join(avail_lines + [stripped]) if avail_lines else stripped
+                    signature = string_pool.setdefault(signature, signature)
+
+                    elements.append(
+                        ApiElement(
+                            name=element_name,
+                            kind=sys.intern(element_kind),
+                            signature=signature,
+                            doc=doc,
+                            ios_introduced=introduced,
+                            deprecated=deprecated,
+                            unavailable=unavailable,
+                            source_file=swift_file,
+                            parent_type=parent_type,
+                        )
                     )
-                )
 
-            doc_lines = []
-            avail_lines = []
+                doc_lines = []
+                avail_lines = []
+
+        # Tally braces on the undecoded line: two C-level scans, no str round trip
+        open_braces = raw.count(b"{")
+        brace_delta = open_braces - raw.count(b"}")
 
-        open_braces = line.count("{")
-        close_braces = line.count("}")
-        brace_depth += open_braces - close_braces
+        brace_depth += brace_delta
 
         if type_match and open_braces > 0:
-            type_stack.append((element_name, brace_depth))
+            # Interned so every member's parent_type shares one string
+            type_stack.append((sys.intern(element_name), brace_depth))
 
-        while type_stack and brace_depth < type_stack[-1][1]:
-            type_stack.pop()
+        # Types can only close when the depth drops
+        if brace_delta < 0:
+            while type_stack and brace_depth < type_stack[-1][1]:
+                type_stack.pop()
 
-        if stripped.startswith("@") and not element_kind:
+        if stripped_raw.startswith(b"@") and not element_kind:
             continue
 
-        if not element_kind and stripped and not stripped.startswith("//"):
+        if not element_kind and not stripped_raw.startswith(b"//"):
             doc_lines = []
             avail_lines = []
 
     return elements
 
 
-def load_all_api_elements(api_dir: Path) -> List[ApiElement]:
-    """Load all API elements from .swift files in api_dir."""
+def api_cache_path(cache_dir: Path, swift_file: Path) -> Path:
+    """Cache entry for a Swift file, keyed on its name, mtime and size."""
+    stat = swift_file.stat()
+    return cache_dir / f"{swift_file.name}.{stat.st_mtime_ns}.{stat.st_size}.v{API_CACHE_VERSION}.pkl"
+
+
+def read_cached_elements(cache_path: Path) -> Optional[List[ApiElement]]:
+    """Return pickled elements for an unchanged file, or None on a cache miss."""
+    if not cache_path.exists():
+        return None
+    try:
+        with cache_path.open("rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"    Ignoring unreadable cache entry {cache_path.name}: {e}")
+        return None
+
+
+def write_cached_elements(cache_path: Path, elements: List[ApiElement]) -> None:
+    """Pickle parsed elements for reuse on later runs."""
+    try:
+        # Write to a temporary name first so an interrupted run never leaves a truncated entry
+        tmp_path = cache_path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump(elements, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"    Could not cache {cache_path.name}: {e}")
+
+
+def load_all_api_elements(api_dir: Path, cache_dir: Optional[Path] = None) -> List[ApiElement]:
+    """Load all API elements from .swift files in api_dir.
+
+    With a cache_dir, each file's parsed elements are pickled and reused until the
+    file's mtime or size changes; entries for changed or removed files are purged.
+    Files that need parsing are spread across worker processes.
+    """
+    # One directory listing; is_file() uses the cached dirent type, no pattern matching
+    with os.scandir(api_dir) as entries:
+        swift_paths = sorted(entry.path for entry in entries if entry.name.endswith(".swift") and entry.is_file())
+    swift_files = [Path(path) for path in swift_paths]
+    cache_paths: List[Optional[Path]] = [None] * len(swift_files)
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_paths = [api_cache_path(cache_dir, swift_file) for swift_file in swift_files]
+
+    results: List[Optional[List[ApiElement]]] = [
+        read_cached_elements(cache_path) if cache_path is not None else None
+        for cache_path in cache_paths
+    ]
+
+    # Files parse independently, so fan the misses out across cores
+    misses = [index for index, result in enumerate(results) if result is None]
+    if misses:
+        with ProcessPoolExecutor() as executor:
+            parsed = executor.map(extract_api_elements, [swift_files[index] for index in misses], chunksize=8)
+            for index, file_elements in zip(misses, parsed):
+                results[index] = file_elements
+                if cache_paths[index] is not None:
+                    write_cached_elements(cache_paths[index], file_elements)
+
     elements: List[ApiElement] = []
-    for swift_file in sorted(api_dir.glob("*.swift")):
+    for swift_file, file_elements in zip(swift_files, results):
         print(f"  Scanning {swift_file.name}...")
-        file_elements = extract_api_elements(swift_file)
         print(f"    Found {len(file_elements)} eligible symbols")
         elements.extend(file_elements)
+
+    if cache_dir is not None:
+        live_entries = {cache_path.name for cache_path in cache_paths}
+        for entry in cache_dir.glob("*.pkl"):
+            if entry.name not in live_entries:
+                entry.unlink()
     return elements
 
 
-def format_availability(element: ApiElement) -> str:
-    """Format version tuple as readable string."""
-    version = element.ios_introduced
+@functools.lru_cache(maxsize=None)
+def format_version(version: Optional[Tuple[int, int]]) -> str:
+    """Format version tuple as readable string; most elements share a handful of versions."""
     if not version:
         return "iOS 17+"
     major, minor = version
     return f"iOS {major}.{minor}+"
 
 
-def build_api_output(element: ApiElement) -> str:
+def format_availability(element: ApiElement) -> str:
+    """Format an element's introduced version as readable string."""
+    return format_version(element.ios_introduced)
+
+
+def build_api_output(element: ApiElement, avail: str) -> str:
     """Build the output text for an API element."""
     parts = []
     if element.doc:
@@ -276,7 +419,7 @@ def build_api_output(element: ApiElement) -> str:
     parts.append("```")
     parts.append("")
 
-    parts.append(f"Availability: {format_availability(element)}")
+    parts.append(f"Availability: {avail}")
     if element.parent_type:
         parts.append(f"Member of: {element.parent_type}")
     parts.append(f"Source: {element.source_file.name}")
@@ -284,32 +427,36 @@ def build_api_output(element: ApiElement) -> str:
     return "\n".join(parts).strip()
 
 
+@functools.lru_cache(maxsize=None)
+def api_instruction_templates(kind: str, avail: str) -> Tuple[str, ...]:
+    """Instruction templates for an element kind and availability, with a {base} slot."""
+    if kind in {"class", "struct", "enum", "actor", "protocol"}:
+        return (
+            f"Explain the {kind} {{base}} for {avail}.",
+            f"Show the Swift declaration and summary for {{base}} on {avail}.",
+        )
+    elif kind == "func":
+        return (
+            f"How do I use {{base}}() on {avail}?",
+            f"Describe the purpose of {{base}} and show its declaration for {avail}.",
+        )
+    else:  # property
+        return (
+            f"What does {{base}} provide on {avail}?",
+            f"Document the property {{base}} for {avail}.",
+        )
+
+
 def build_api_examples(element: ApiElement) -> List[dict]:
     """Generate instruction examples from an API element."""
-    output = build_api_output(element)
-    base = element.full_name
     avail = format_availability(element)
+    output = build_api_output(element, avail)
+    base = element.full_name
 
-    templates: List[str] = []
-    if element.kind in {"class", "struct", "enum", "actor", "protocol"}:
-        templates = [
-            f"Explain the {element.kind} {base} for {avail}.",
-            f"Show the Swift declaration and summary for {base} on {avail}.",
-        ]
-    elif element.kind == "func":
-        templates = [
-            f"How do I use {base}() on {avail}?",
-            f"Describe the purpose of {base} and show its declaration for {avail}.",
-        ]
-    else:  # property
-        templates = [
-            f"What does {base} provide on {avail}?",
-            f"Document the property {base} for {avail}.",
-        ]
-
+    # Only the element name varies per call; a plain replace fills it in
     return [
-        {"instruction": template, "input": "", "output": output}
-        for template in templates
+        {"instruction": template.replace("{base}", base), "input": "", "output": output}
+        for template in api_instruction_templates(element.kind, avail)
     ]
 
 
@@ -330,13 +477,19 @@ class SwiftCodeExampleParser:
         )
         self.comment_pattern = re.compile(r"//\s*NOTE:\s*(.+)$", re.MULTILINE)
         
-        self.copyright_patterns = [
-            re.compile(r"^\s*//\s*Created by.*$", re.MULTILINE),
-            re.compile(r"^\s*//\s*Copyright.*$", re.MULTILINE),
-            re.compile(r"^\s*//\s*@BigMtnStudio.*$", re.MULTILINE),
-            re.compile(r"^\s*//\s*Twitter:.*$", re.MULTILINE),
-            re.compile(r"^\s*//\s*All rights reserved.*$", re.MULTILINE),
-        ]
+        # Word boundaries in CamelCase: lower->Upper, and before the last
+        # capital of a run that starts a new word (e.g. "UIKit" -> "UI Kit")
+        self.camel_boundary_pattern = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+        
+        # Comment prefixes for copyright/attribution lines to strip
+        self.copyright_prefixes = (
+            "Created by",
+            "Copyright",
+            "@BigMtnStudio",
+            "Twitter:",
+            "All rights reserved",
+        )
+        self.blank_lines_pattern = re.compile(r"\n{3,}")
 
     def parse_file(self, file_path: Path, category: str) -> Optional[CodeExample]:
         """Parse a Swift file into a CodeExample."""
@@ -346,7 +499,8 @@ class SwiftCodeExampleParser:
             print(f"Error reading {file_path}: {e}")
             return None
 
-        if not code.strip():
+        # Same test as "not code.strip()" without copying the file's text
+        if not code or code.isspace():
             return None
 
         file_name = file_path.stem
@@ -357,14 +511,15 @@ class SwiftCodeExampleParser:
         view_name = view_match.group(1) if view_match else file_name
         
         description = self._extract_description(code)
-        code = self._strip_copyright_comments(code)
+        # Stored stripped so instruction generation never re-strips it
+        code = self._strip_copyright_comments(code).strip()
 
         return CodeExample(
             file_path=file_path,
             file_name=file_name,
-            topic=topic,
+            topic=sys.intern(topic),
             subtopic=subtopic,
-            category=category,
+            category=sys.intern(category),
             code=code,
             imports=imports,
             view_name=view_name,
@@ -384,29 +539,35 @@ class SwiftCodeExampleParser:
 
     def _to_readable(self, text: str) -> str:
         """Convert CamelCase to readable text."""
-        result = re.sub(r"([a-z])([A-Z])", r"\1 \2", text)
-        result = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1 \2", result)
-        return result
+        return self.camel_boundary_pattern.sub(" ", text)
 
     def _strip_copyright_comments(self, code: str) -> str:
         """Remove copyright and attribution comments."""
-        for pattern in self.copyright_patterns:
-            code = pattern.sub("", code)
+        # One pass over the lines; matching comments become blank lines
+        lines = code.split("\n")
+        for index, line in enumerate(lines):
+            comment = line.lstrip()
+            if comment.startswith("//") and comment[2:].lstrip().startswith(self.copyright_prefixes):
+                lines[index] = ""
+        code = "\n".join(lines)
         
-        code = re.sub(r"\n{3,}", "\n\n", code)
+        code = self.blank_lines_pattern.sub("\n\n", code)
         code = code.lstrip("\n")
         
         return code
 
     def _extract_description(self, code: str) -> str:
         """Extract description from HeaderView or NOTE comments."""
-        header_match = self.header_desc_pattern.search(code)
-        if header_match:
-            return header_match.group(1)
+        # Each pattern needs its literal, and a substring test is far cheaper than a scan
+        if "HeaderView(" in code:
+            header_match = self.header_desc_pattern.search(code)
+            if header_match:
+                return header_match.group(1)
         
-        note_matches = self.comment_pattern.findall(code)
-        if note_matches:
-            return " ".join(note_matches)
+        if "NOTE:" in code:
+            note_matches = self.comment_pattern.findall(code)
+            if note_matches:
+                return " ".join(note_matches)
         
         return ""
 
@@ -415,129 +576,129 @@ class InstructionGenerator:
     """Generates instruction examples from code examples."""
 
     def __init__(self):
+        # Templates are f-string lambdas: calling one skips str.format's parse of the template
         self.code_request_templates = [
-            "Show me how to implement {topic} in SwiftUI.",
-            "Write SwiftUI code that demonstrates {topic}.",
-            "Give me an example of {topic} in SwiftUI.",
-            "Create a SwiftUI view that shows {topic}.",
-            "Demonstrate {topic} with SwiftUI code.",
+            lambda topic: f"Show me how to implement {topic} in SwiftUI.",
+            lambda topic: f"Write SwiftUI code that demonstrates {topic}.",
+            lambda topic: f"Give me an example of {topic} in SwiftUI.",
+            lambda topic: f"Create a SwiftUI view that shows {topic}.",
+            lambda topic: f"Demonstrate {topic} with SwiftUI code.",
         ]
         
         self.specific_code_templates = [
-            "Show me how to {subtopic} with {topic} in SwiftUI.",
-            "Write SwiftUI code for {topic} that demonstrates {subtopic}.",
-            "Give me an example of {subtopic} with {topic} in SwiftUI.",
+            lambda topic, subtopic: f"Show me how to {subtopic} with {topic} in SwiftUI.",
+            lambda topic, subtopic: f"Write SwiftUI code for {topic} that demonstrates {subtopic}.",
+            lambda topic, subtopic: f"Give me an example of {subtopic} with {topic} in SwiftUI.",
         ]
         
         self.question_templates = [
-            "How do I use {topic} in SwiftUI?",
-            "What's the best way to implement {topic} in SwiftUI?",
-            "How do I {subtopic} using {topic} in SwiftUI?",
+            lambda topic, subtopic: f"How do I use {topic} in SwiftUI?",
+            lambda topic, subtopic: f"What's the best way to implement {topic} in SwiftUI?",
+            lambda topic, subtopic: f"How do I {subtopic} using {topic} in SwiftUI?",
         ]
+        
+        self._code_n = len(self.code_request_templates)
+        self._specific_n = len(self.specific_code_templates)
 
     def generate_examples(self, example: CodeExample) -> List[Dict[str, str]]:
         """Generate instruction examples from a code example."""
         examples = []
+        # Templates are drawn here, in the same order random.choice drew them
+        randrange = random.randrange
+        topic = example.topic.lower()
+        subtopic = example.subtopic.lower()
+        # Parsing already stripped the code; every example shares one fenced block
+        code_block = f"```swift\n{example.code}\n```"
         
-        examples.append(self._generate_code_example(example))
-        examples.append(self._generate_question_example(example))
+        topic_display = topic
+        if subtopic not in INTRO_SUBTOPICS:
+            topic_display = f"{topic} - {subtopic}"
         
-        if example.subtopic.lower() not in ["intro", "introduction", "default"]:
-            examples.append(self._generate_subtopic_example(example))
+        template = self.code_request_templates[randrange(self._code_n)]
+        examples.append(self._generate_code_example(template, topic_display, code_block))
+        examples.append(self._generate_question_example(example, topic, subtopic, code_block))
         
-        if any(imp in example.imports for imp in ["SwiftData", "Charts"]):
-            examples.append(self._generate_framework_example(example))
+        if subtopic not in GENERIC_SUBTOPICS:
+            template = self.specific_code_templates[randrange(self._specific_n)]
+            examples.append(self._generate_subtopic_example(template, topic, subtopic, code_block))
+        
+        # One scan finds the first framework import, in source order
+        framework = next((imp for imp in example.imports if imp in FRAMEWORK_IMPORTS), None)
+        if framework:
+            examples.append(self._generate_framework_example(framework, topic, code_block))
 
         return examples
 
-    def _generate_code_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_code_example(self, template: Callable[[str], str], topic_display: str,
+                               code_block: str) -> Dict[str, str]:
         """Generate a direct code request example."""
-        topic_display = f"{example.topic}"
-        if example.subtopic.lower() not in ["intro", "introduction"]:
-            topic_display = f"{example.topic} - {example.subtopic}"
-        
-        instruction = random.choice(self.code_request_templates).format(
-            topic=topic_display.lower()
-        )
-        
-        output = f"```swift\n{example.code.strip()}\n```"
+        instruction = template(topic_display)
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": output
+            "output": code_block
         }
 
-    def _generate_question_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_question_example(self, example: CodeExample, topic: str, subtopic: str,
+                                   code_block: str) -> Dict[str, str]:
         """Generate a question-style example."""
-        instruction = self.question_templates[0].format(
-            topic=example.topic.lower(),
-            subtopic=example.subtopic.lower()
-        )
-        
-        parts = []
-        if example.description:
-            parts.append(example.description)
-            parts.append("")
+        instruction = self.question_templates[0](topic, subtopic)
         
-        parts.append(f"Here's an example of {example.topic.lower()} in SwiftUI:")
-        parts.append("")
-        parts.append("```swift")
-        parts.append(example.code.strip())
-        parts.append("```")
+        description = f"{example.description}\n\n" if example.description else ""
+        output = f"{description}Here's an example of {topic} in SwiftUI:\n\n{code_block}"
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": "\n".join(parts)
+            "output": output
         }
 
-    def _generate_subtopic_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_subtopic_example(self, template: Callable[[str, str], str], topic: str, subtopic: str,
+                                   code_block: str) -> Dict[str, str]:
         """Generate a subtopic-specific example."""
-        template = random.choice(self.specific_code_templates)
-        instruction = template.format(
-            topic=example.topic.lower(),
-            subtopic=example.subtopic.lower()
-        )
-        
-        output = f"```swift\n{example.code.strip()}\n```"
+        instruction = template(topic, subtopic)
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": output
+            "output": code_block
         }
 
-    def _generate_framework_example(self, example: CodeExample) -> Dict[str, str]:
+    def _generate_framework_example(self, framework: str, topic: str,
+                                    code_block: str) -> Dict[str, str]:
         """Generate framework-specific example."""
-        frameworks = [imp for imp in example.imports if imp in ["SwiftData", "Charts"]]
-        framework = frameworks[0] if frameworks else "SwiftUI"
-        
-        instruction = f"Show me how to use {framework} with {example.topic.lower()} in SwiftUI."
-        
-        parts = []
-        parts.append(f"Here's an example using {framework} for {example.topic.lower()}:")
-        parts.append("")
-        parts.append("```swift")
-        parts.append(example.code.strip())
-        parts.append("```")
+        instruction = f"Show me how to use {framework} with {topic} in SwiftUI."
+        output = f"Here's an example using {framework} for {topic}:\n\n{code_block}"
         
         return {
             "instruction": instruction,
             "input": "",
-            "output": "\n".join(parts)
+            "output": output
         }
 
 
+@functools.lru_cache(maxsize=None)
+def code_example_parser() -> SwiftCodeExampleParser:
+    """One parser per process, so its regexes compile once per worker."""
+    return SwiftCodeExampleParser()
+
+
+def parse_code_example(job: Tuple[Path, str]) -> Optional[CodeExample]:
+    """Parse one (swift_file, category) pair; runs in pool workers."""
+    swift_file, category = job
+    return code_example_parser().parse_file(swift_file, category)
+
+
 def process_code_examples_directory(base_dir: Path) -> List[CodeExample]:
     """Process all Swift files in code examples directory."""
-    parser = SwiftCodeExampleParser()
     examples = []
     
     if not base_dir.exists():
         print(f"Directory not found: {base_dir}")
         return examples
     
+    jobs: List[Tuple[Path, str]] = []
     for category_dir in base_dir.iterdir():
         if not category_dir.is_dir():
             continue
@@ -548,24 +709,29 @@ def process_code_examples_directory(base_dir: Path) -> List[CodeExample]:
         swift_files = list(category_dir.glob("*.swift"))
         print(f"    Found {len(swift_files)} Swift files")
         
-        for swift_file in swift_files:
-            example = parser.parse_file(swift_file, category)
+        jobs.extend((swift_file, category) for swift_file in swift_files)
+    
+    if not jobs:
+        return examples
+    
+    # Files parse independently, so fan them out across cores
+    with ProcessPoolExecutor() as executor:
+        for example in executor.map(parse_code_example, jobs, chunksize=32):
             if example:
+                # Interning does not survive the trip back from the workers
+                example.topic = sys.intern(example.topic)
+                example.category = sys.intern(example.category)
                 examples.append(example)
     
     return examples
 
 
-def generate_code_dataset(examples: List[CodeExample]) -> List[Dict[str, str]]:
-    """Generate instruction-tuning dataset from code examples."""
+def generate_code_dataset(examples: List[CodeExample]) -> Iterator[Dict[str, str]]:
+    """Yield instruction-tuning rows from code examples."""
     generator = InstructionGenerator()
-    dataset = []
     
     for example in examples:
-        instruction_examples = generator.generate_examples(example)
-        dataset.extend(instruction_examples)
-    
-    return dataset
+        yield from generator.generate_examples(example)
 
 
 def to_chat_messages(row: Dict[str, str]) -> Dict:
@@ -594,37 +760,50 @@ def to_chat_messages(row: Dict[str, str]) -> Dict:
     }
 
 
-def save_unified_datasets(dataset: List[Dict[str, str]], output_dir: Path, 
+def dump_jsonl_row(row: Dict) -> bytes:
+    """Serialize a row as one UTF-8 encoded JSONL line."""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def serialize_rows(rows: Iterable[Dict[str, str]]) -> List[bytes]:
+    """Convert rows to chat messages and serialize each one as it is produced.
+
+    Only the compact JSONL bytes are kept, never the row dicts.
+    """
+    return [dump_jsonl_row(to_chat_messages(row)) for row in rows]
+
+
+def write_jsonl(path: Path, lines: List[bytes]) -> None:
+    """Write already serialized JSONL lines through a 1 MiB buffer."""
+    with path.open("wb", buffering=JSONL_BUFFER_SIZE) as f:
+        f.writelines(lines)
+
+
+def save_unified_datasets(lines: List[bytes], output_dir: Path, 
                          train_ratio: float = 0.8) -> None:
-    """Save unified dataset with train/test split in mlx-lm chat messages format."""
+    """Save serialized chat-message rows (see serialize_rows) with a train/test split."""
     output_dir.mkdir(parents=True, exist_ok=True)
-    random.shuffle(dataset)
-
-    # Convert all rows to mlx-lm compatible chat messages format
-    converted = [to_chat_messages(row) for row in dataset]
-    print(f"Converted {len(converted)} rows to chat messages format for mlx-lm")
+    # Shuffling the serialized lines permutes them exactly as shuffling the rows did
+    random.shuffle(lines)
+    print(f"Converted {len(lines)} rows to chat messages format for mlx-lm")
 
+    # The train/test files reuse the same bytes
     full_path = output_dir / "unified_finetune_dataset.jsonl"
-    with full_path.open("w", encoding="utf-8") as f:
-        for row in converted:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    write_jsonl(full_path, lines)
 
-    split = int(len(converted) * train_ratio)
-    train_rows = converted[:split]
-    test_rows = converted[split:]
+    split = int(len(lines) * train_ratio)
+    train_rows = lines[:split]
+    test_rows = lines[split:]
 
     train_path = output_dir / "unified_train_dataset.jsonl"
     test_path = output_dir / "unified_test_dataset.jsonl"
 
-    with train_path.open("w", encoding="utf-8") as f:
-        for row in train_rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
-
-    with test_path.open("w", encoding="utf-8") as f:
-        for row in test_rows:
-            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    write_jsonl(train_path, train_rows)
+    write_jsonl(test_path, test_rows)
 
-    print(f"Saved full unified dataset to {full_path} ({len(dataset)} rows)")
+    print(f"Saved full unified dataset to {full_path} ({len(lines)} rows)")
     print(f"Saved train split to {train_path} ({len(train_rows)} rows)")
     print(f"Saved test split to {test_path} ({len(test_rows)} rows)")
 
@@ -637,6 +816,7 @@ def main() -> None:
     api_dir = base_dir.parent / "api_training_data"
     code_examples_dir = base_dir / "code_examples"
     output_dir = base_dir / "data"
+    api_cache_dir = base_dir / ".cache" / "api_elements"
 
     print("=" * 70)
     print("Generating UNIFIED fine-tuning dataset")
@@ -651,15 +831,16 @@ def main() -> None:
         print(f"API directory not found: {api_dir}")
         return
     
-    api_elements = load_all_api_elements(api_dir)
+    api_elements = load_all_api_elements(api_dir, api_cache_dir)
     print(f"Total eligible API elements: {len(api_elements)}\n")
 
     # Generate API examples
     print("Generating instruction examples from API definitions...")
-    api_examples: List[Dict[str, str]] = []
-    for element in api_elements:
-        api_examples.extend(build_api_examples(element))
-    print(f"Total API instruction pairs: {len(api_examples)}\n")
+    # Rows are serialized as they are generated, so no list of dicts is ever built
+    api_lines = serialize_rows(
+        row for element in api_elements for row in build_api_examples(element)
+    )
+    print(f"Total API instruction pairs: {len(api_lines)}\n")
 
     # Load code examples
     print("Loading code examples...")
@@ -672,24 +853,29 @@ def main() -> None:
 
     # Generate code examples
     print("Generating instruction examples from code examples...")
-    code_instruction_examples = generate_code_dataset(code_examples)
-    print(f"Total code instruction pairs: {len(code_instruction_examples)}\n")
+    code_lines = serialize_rows(generate_code_dataset(code_examples))
+    print(f"Total code instruction pairs: {len(code_lines)}\n")
 
     # Combine datasets
-    unified_dataset = api_examples + code_instruction_examples
-    print(f"TOTAL unified dataset size: {len(unified_dataset)} instruction pairs")
+    api_count = len(api_lines)
+    code_count = len(code_lines)
+    unified_lines = api_lines
+    unified_lines.extend(code_lines)
+    del code_lines
+    total_count = len(unified_lines)
+    print(f"TOTAL unified dataset size: {total_count} instruction pairs")
     
     # Save unified datasets
     print("\nSaving unified datasets...")
-    save_unified_datasets(unified_dataset, output_dir)
+    save_unified_datasets(unified_lines, output_dir)
 
     # Print summary
     print("\n" + "=" * 70)
     print("Summary")
     print("=" * 70)
-    print(f"API reference pairs: {len(api_examples)}")
-    print(f"Code example pairs: {len(code_instruction_examples)}")
-    print(f"Total combined pairs: {len(unified_dataset)}")
+    print(f"API reference pairs: {api_count}")
+    print(f"Code example pairs: {code_count}")
+    print(f"Total combined pairs: {total_count}")
     print(f"\nBreakdown by framework (code examples):")
     
     category_counts = {}
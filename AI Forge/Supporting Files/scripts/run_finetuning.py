@@ -14,9 +14,19 @@ import subprocess
 import sys
 import os
 import json
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# `ollama list` output is reused briefly so back-to-back runs skip the shell-out
+OLLAMA_LIST_CACHE = Path.home() / ".cache" / "ai-forge" / "ollama_list.json"
+OLLAMA_LIST_TTL = 60  # seconds
+
 
 def check_ollama_installed() -> bool:
     """Check if Ollama is installed and accessible."""
@@ -32,33 +42,74 @@ def check_ollama_installed() -> bool:
         return False
 
 
+def count_lines(path: Path) -> int:
+    """Count lines by scanning raw 1 MiB chunks for newlines."""
+    lines = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    # A trailing line without a newline still counts
+    return lines + (1 if last != b"\n" else 0)
+
+
+def split_model_tag(model_name: str) -> Tuple[str, str]:
+    """Split an Ollama model name into (base name, tag); the tag defaults to 'latest'."""
+    base_name, sep, rest = model_name.partition(':')
+    # Only the text up to a second colon is the tag, as split(':')[1] read it
+    return base_name, rest.partition(':')[0] if sep else 'latest'
+
+
+def list_ollama_models() -> Optional[str]:
+    """Return `ollama list` output, reusing a copy younger than OLLAMA_LIST_TTL."""
+    try:
+        with open(OLLAMA_LIST_CACHE, 'r') as f:
+            cached = json.load(f)
+        if time.time() - cached["listed_at"] < OLLAMA_LIST_TTL:
+            return cached["stdout"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
+    result = subprocess.run(
+        ["ollama", "list"],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    if result.returncode != 0:
+        return None
+    
+    try:
+        OLLAMA_LIST_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(OLLAMA_LIST_CACHE, 'w') as f:
+            json.dump({"listed_at": time.time(), "stdout": result.stdout}, f)
+    except OSError:
+        pass
+    return result.stdout
+
+
 def check_ollama_model(model_name: str) -> bool:
     """Check if an Ollama model is available locally."""
     try:
-        result = subprocess.run(
-            ["ollama", "list"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode == 0:
+        stdout = list_ollama_models()
+        if stdout is not None:
             # Print the full output for debugging
             print("Available Ollama models:")
-            print(result.stdout)
+            print(stdout)
             print()
             
             # Parse the output to find the model
             # Ollama list output format: NAME ID SIZE MODIFIED
-            base_name = model_name.split(':')[0]
-            tag = model_name.split(':')[1] if ':' in model_name else 'latest'
+            base_name, tag = split_model_tag(model_name)
+            has_tag = ':' in model_name
             
-            for line in result.stdout.strip().split('\n')[1:]:  # Skip header
+            for line in stdout.strip().split('\n')[1:]:  # Skip header
                 if line.strip():
                     parts = line.split()
                     if parts:
                         listed_name = parts[0]
-                        listed_base = listed_name.split(':')[0]
-                        listed_tag = listed_name.split(':')[1] if ':' in listed_name else 'latest'
+                        listed_base, listed_tag = split_model_tag(listed_name)
                         
                         # Check for exact match
                         if listed_name == model_name:
@@ -71,7 +122,7 @@ def check_ollama_model(model_name: str) -> bool:
                             return True
                         
                         # If no tag specified, match any tag of the base model
-                        if ':' not in model_name and listed_base == base_name:
+                        if not has_tag and listed_base == base_name:
                             print(f"✓ Found model with tag: {listed_name}")
                             return True
         return False
@@ -89,6 +140,9 @@ def pull_ollama_model(model_name: str) -> bool:
             capture_output=False,  # Show progress to user
             timeout=3600  # 1 hour timeout for large models
         )
+        if result.returncode == 0:
+            # The cached `ollama list` no longer reflects the installed models
+            OLLAMA_LIST_CACHE.unlink(missing_ok=True)
         return result.returncode == 0
     except subprocess.TimeoutExpired:
         print(f"Error: Timeout while pulling model '{model_name}'")
@@ -111,24 +165,30 @@ def estimate_tokens(text: str) -> int:
     return max(1, len(text) // 4)
 
 
-def split_long_sequence(user_part: str, assistant_part: str, max_tokens: int = 512) -> list:
+def split_long_sequence(user_part: str, assistant_part: str, max_tokens: int = 512,
+                        total_tokens: Optional[int] = None) -> list:
     """
     Split a user/assistant pair if it exceeds max_tokens.
     Returns list of {"text": ...} dicts representing complete examples.
     
     Strategy: If output is too long, chunk it while preserving context.
     Each chunk becomes a separate training example.
+    
+    Pass total_tokens when the caller has already estimated the formatted
+    pair, so the whole text is not scanned again.
     """
     # First, check if formatted text exceeds limit
     formatted = f"<|user|>\n{user_part}<|assistant|>\n{assistant_part}"
+    if total_tokens is None:
+        total_tokens = estimate_tokens(formatted)
     
-    if estimate_tokens(formatted) <= max_tokens:
+    if total_tokens <= max_tokens:
         return [{"text": formatted}]
     
     # Need to split - chunk the assistant output intelligently
     results = []
     
-    # Calculate tokens used by user portion and delimiters
+    # Calculate tokens used by user portion and delimiters; every chunk reuses this prefix
     user_formatted = f"<|user|>\n{user_part}<|assistant|>\n"
     user_tokens = estimate_tokens(user_formatted)
     
@@ -141,7 +201,8 @@ def split_long_sequence(user_part: str, assistant_part: str, max_tokens: int = 5
     current_tokens = 0
     
     for line in output_lines:
-        if not line.strip():
+        # Same test as "not line.strip()" without building a stripped copy
+        if not line or line.isspace():
             continue
         
         line_tokens = estimate_tokens(line)
@@ -149,8 +210,7 @@ def split_long_sequence(user_part: str, assistant_part: str, max_tokens: int = 5
         # If adding this line exceeds limit and we have content, save chunk
         if current_tokens + line_tokens > available_for_output and current_chunk:
             chunk_text = '\n'.join(current_chunk)
-            formatted_chunk = f"<|user|>\n{user_part}<|assistant|>\n{chunk_text}"
-            results.append({"text": formatted_chunk})
+            results.append({"text": user_formatted + chunk_text})
             current_chunk = [line]
             current_tokens = line_tokens
         else:
@@ -160,21 +220,26 @@ def split_long_sequence(user_part: str, assistant_part: str, max_tokens: int = 5
     # Save final chunk if it has content
     if current_chunk:
         chunk_text = '\n'.join(current_chunk)
-        formatted_chunk = f"<|user|>\n{user_part}<|assistant|>\n{chunk_text}"
-        results.append({"text": formatted_chunk})
+        results.append({"text": user_formatted + chunk_text})
     
     # Fallback: if splitting failed, return original (will be truncated by MLX)
     return results if results else [{"text": formatted}]
 
 
+def dump_jsonl_row(row: dict) -> bytes:
+    """Serialize a row as one UTF-8 encoded JSONL line."""
+    if orjson is not None:
+        return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(row) + '\n').encode('utf-8')
+
+
 def get_ollama_model_path(model_name: str) -> str:
     """Get the local path for an Ollama model for use with MLX."""
     # Ollama stores models in ~/.ollama/models
     ollama_models_dir = Path.home() / ".ollama" / "models"
     
     # Ollama model names can have tags like "qwen2.5-coder:7b"
-    base_name = model_name.split(':')[0]
-    tag = model_name.split(':')[1] if ':' in model_name else 'latest'
+    base_name, tag = split_model_tag(model_name)
     
     # Check for the model manifest
     manifest_path = ollama_models_dir / "manifests" / "registry.ollama.ai" / "library" / base_name / tag
@@ -197,7 +262,7 @@ def get_ollama_model_path(model_name: str) -> str:
     return model_name
 
 
-def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: float = 0.9, max_seq_length: int = 512) -> Optional[Tuple[Path, Path]]:
+def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: float = 0.9, max_seq_length: int = 512) -> Optional[Tuple[Path, Path, int, int]]:
     """
     Convert Alpaca-format dataset to MLX-compatible format with train/validation split.
     
@@ -208,7 +273,7 @@ def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: f
     
     MLX typically expects separate train.jsonl and valid.jsonl files.
     
-    Returns: (train_path, valid_path) or None if failed
+    Returns: (train_path, valid_path, train_count, valid_count) or None if failed
     """
     try:
         import json
@@ -247,16 +312,24 @@ def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: f
                     
                     # Check and handle token length
                     formatted = f"<|user|>\n{user_part}<|assistant|>\n{assistant_part}"
+                    
+                    # Collapsing whitespace never lengthens text, so this bounds estimate_tokens.
+                    # Rows within both the limit and the longest seen so far skip the scan.
+                    upper_bound = max(1, len(formatted) // 4)
+                    if upper_bound <= max_seq_length and upper_bound <= max_seq_found:
+                        mlx_data.append(dump_jsonl_row({"text": formatted}))
+                        continue
+                    
                     tokens = estimate_tokens(formatted)
                     max_seq_found = max(max_seq_found, tokens)
                     
-                    # Split if necessary
+                    # Split if necessary; rows are serialized once, here, and kept as JSONL lines
                     if tokens > max_seq_length:
-                        chunks = split_long_sequence(user_part, assistant_part, max_seq_length)
-                        mlx_data.extend(chunks)
+                        chunks = split_long_sequence(user_part, assistant_part, max_seq_length, tokens)
+                        mlx_data.extend(dump_jsonl_row(chunk) for chunk in chunks)
                         sequences_split += 1
                     else:
-                        mlx_data.append({"text": formatted})
+                        mlx_data.append(dump_jsonl_row({"text": formatted}))
                         
                 except json.JSONDecodeError:
                     continue
@@ -282,15 +355,13 @@ def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: f
         
         # Write train dataset
         train_path = output_dir / "train.jsonl"
-        with open(train_path, 'w', encoding='utf-8') as f:
-            for item in train_data:
-                f.write(json.dumps(item) + '\n')
+        with open(train_path, 'wb') as f:
+            f.writelines(train_data)
         
         # Write validation dataset
         valid_path = output_dir / "valid.jsonl"
-        with open(valid_path, 'w', encoding='utf-8') as f:
-            for item in valid_data:
-                f.write(json.dumps(item) + '\n')
+        with open(valid_path, 'wb') as f:
+            f.writelines(valid_data)
         
         print(f"✓ Dataset preparation complete:")
         print(f"  - Total examples (after splitting): {len(mlx_data)}")
@@ -304,7 +375,7 @@ def prepare_mlx_dataset_split(input_path: Path, output_dir: Path, train_ratio: f
             print(f"  Long sequences were chunked to fit within {max_seq_length}-token limit")
             print(f"  This preserves training information that would otherwise be lost")
         
-        return (train_path, valid_path)
+        return (train_path, valid_path, len(train_data), len(valid_data))
         
     except IOError as e:
         print(f"Error reading/writing dataset files: {e}")
@@ -350,7 +421,7 @@ def run_mlx_finetuning(
             print("Error: Failed to prepare dataset for MLX")
             return False
         
-        train_path, valid_path = result
+        train_path, valid_path, train_samples, _ = result
         
         # Prepare output directories
         adapter_dir = output_dir / "adapters"
@@ -361,13 +432,7 @@ def run_mlx_finetuning(
         print("-" * 60)
         
         # MLX lora expects iterations, not epochs
-        # Use train.jsonl to estimate iterations
-        try:
-            with open(train_path, 'r') as f:
-                train_samples = sum(1 for line in f if line.strip())
-        except:
-            train_samples = 1440  # Fallback estimate
-        
+        # train_samples comes straight from the split, no need to re-read train.jsonl
         # Standard MLX calculation: iterations = ceil(samples / batch_size) * epochs
         iters_per_epoch = max(10, (train_samples + batch_size - 1) // batch_size)
         total_iters = iters_per_epoch * epochs
@@ -555,8 +620,7 @@ def main():
     
     # Count lines in dataset for diagnostics
     try:
-        with open(dataset_path, 'r') as f:
-            dataset_lines = sum(1 for line in f if line.strip())
+        dataset_lines = count_lines(dataset_path)
         print(f"✓ Dataset found: {dataset_path}")
         print(f"  - File size: {dataset_size} bytes")
         print(f"  - Lines/entries: {dataset_lines}")
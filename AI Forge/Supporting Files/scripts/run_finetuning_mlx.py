@@ -10,16 +10,48 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
 import os
+import platform
+import shutil
 import subprocess
 import sys
 import tempfile
+import time
 from pathlib import Path
 from typing import Optional, Tuple
 
 import yaml
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:  # PyYAML built without libyaml; use the pure-Python emitter
+    from yaml import SafeDumper
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both
+loads_json = orjson.loads if orjson is not None else json.loads
+
+
+# Low-memory runs adapt only the attention query/value projections (mlx_lm key names)
+LOW_MEMORY_LORA_RANK = 4
+LOW_MEMORY_LORA_KEYS = ['self_attn.q_proj', 'self_attn.v_proj']
+
+# Lowercased markers of a Metal/MLX allocation failure in the training output
+OOM_PATTERNS = (b"out of memory", b"outofmemory", b"insufficient memory")
+
+# Records which input produced the prepared train/valid files so unchanged datasets are reused
+DATASET_HASH_FILE = ".dataset.hash"
+
+# Models that passed check_model_available recently, so repeat runs skip the HF round trip
+MODEL_CHECK_CACHE = Path.home() / ".cache" / "ai-forge" / "model_check.json"
+MODEL_CHECK_TTL = 24 * 60 * 60  # seconds
+
 
 def log_section(title: str):
     """Print a formatted section header."""
@@ -50,6 +82,73 @@ def check_mlx_installed() -> bool:
         return False
 
 
+def raise_wired_limit(apply: bool) -> None:
+    """
+    Raise the GPU wired-memory limit (iogpu.wired_limit_mb) to 90% of RAM.
+    
+    macOS lets the GPU pin only about two thirds of unified memory by
+    default, which is where large models hit out-of-memory errors. The
+    sysctl needs root and resets at reboot, so it is only applied when
+    asked for (via non-interactive sudo); otherwise the command is printed.
+    """
+    if platform.system() != "Darwin":
+        return
+    
+    try:
+        result = subprocess.run(
+            ["sysctl", "-n", "hw.memsize"], capture_output=True, text=True, timeout=10
+        )
+        total_mb = int(result.stdout.strip()) // (1024 * 1024)
+    except (subprocess.TimeoutExpired, FileNotFoundError, ValueError):
+        return
+    
+    setting = f"iogpu.wired_limit_mb={total_mb * 90 // 100}"
+    if not apply:
+        print(f"Tip: allow the GPU more memory with: sudo sysctl {setting}")
+        print("     (or pass --raise-memory-limit; the setting resets at reboot)")
+        return
+    
+    # -n: fail instead of waiting for a password the app cannot type
+    result = subprocess.run(
+        ["sudo", "-n", "sysctl", setting], capture_output=True, text=True
+    )
+    if result.returncode == 0:
+        print(f"✓ GPU wired-memory limit raised: {setting}")
+    else:
+        print("⚠️  Could not raise the GPU wired-memory limit (needs sudo without a password)")
+        print(f"   Run it yourself: sudo sysctl {setting}")
+
+
+def load_model_check_cache() -> dict:
+    """Load the model check cache, treating a missing or corrupt file as empty."""
+    try:
+        with open(MODEL_CHECK_CACHE, 'r') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_model_check_cache(cache: dict) -> None:
+    """Persist the model check cache; failures only cost a live check next run."""
+    try:
+        MODEL_CHECK_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(MODEL_CHECK_CACHE, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
+
+def cached_tokenizer_config(model_name: str) -> Optional[str]:
+    """Return the local path of the model's tokenizer config if the HF cache has it."""
+    try:
+        from huggingface_hub import try_to_load_from_cache
+        path = try_to_load_from_cache(model_name, "tokenizer_config.json")
+    except Exception:
+        return None
+    return path if isinstance(path, str) and os.path.isfile(path) else None
+
+
 def check_model_available(model_name: str) -> bool:
     """Check if model is available on Hugging Face or can be downloaded."""
     print(f"Checking model availability: {model_name}...", end=" ", flush=True)
@@ -74,47 +173,181 @@ def check_model_available(model_name: str) -> bool:
         
         return False
 
+    # A recent successful check is enough as long as the tokenizer is still in the HF cache
+    cache = load_model_check_cache()
+    entry = cache.get(model_name)
+    if isinstance(entry, dict) and time.time() - entry.get("verified_at", 0) < MODEL_CHECK_TTL:
+        if cached_tokenizer_config(model_name):
+            print("✓ (cached)")
+            return True
+
     try:
         from transformers import AutoTokenizer
         AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
         print("✓")
+        cache[model_name] = {"verified_at": time.time()}
+        save_model_check_cache(cache)
         return True
     except Exception as e:
         print(f"✗\n  Error: {e}")
         return False
 
 
+def quantize_model(model_name: str, cache_dir: Path, q_bits: int) -> Optional[str]:
+    """
+    Convert a model to a quantized MLX copy for QLoRA training.
+    
+    The converted model is cached under cache_dir and reused on later runs.
+    
+    Args:
+        model_name: HuggingFace model ID or local model path
+        cache_dir: Directory holding converted models
+        q_bits: Bits per weight (4 or 8)
+    
+    Returns:
+        Path of the quantized model, or None if conversion failed
+    """
+    # A local model that is already quantized can be trained as-is
+    local_config = Path(model_name) / "config.json"
+    if local_config.is_file():
+        try:
+            with open(local_config, 'r', encoding='utf-8') as f:
+                if "quantization" in json.load(f):
+                    print(f"✓ Model is already quantized: {model_name}")
+                    return model_name
+        except (OSError, json.JSONDecodeError):
+            pass
+    
+    mlx_path = cache_dir / f"{model_name.strip('/').replace('/', '--')}-{q_bits}bit"
+    if (mlx_path / "config.json").is_file():
+        print(f"✓ Using cached {q_bits}-bit model: {mlx_path}")
+        return str(mlx_path)
+    
+    # mlx_lm refuses to overwrite an existing directory, so convert into a
+    # scratch path and move it into place only once conversion succeeds
+    tmp_path = mlx_path.with_name(mlx_path.name + ".tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    
+    cmd = [
+        sys.executable, "-m", "mlx_lm", "convert",
+        "--hf-path", model_name,
+        "-q",
+        "--q-bits", str(q_bits),
+        "--mlx-path", str(tmp_path),
+    ]
+    print(f"Quantizing {model_name} to {q_bits}-bit (one-time conversion)...")
+    try:
+        result = subprocess.run(cmd, timeout=None)
+    except KeyboardInterrupt:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    
+    if result.returncode != 0:
+        print(f"✗ Quantization failed (exit code {result.returncode})")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        return None
+    
+    shutil.rmtree(mlx_path, ignore_errors=True)
+    os.replace(tmp_path, mlx_path)
+    print(f"✓ Quantized model saved to: {mlx_path}")
+    return str(mlx_path)
+
+
+def hash_files(*paths: Path) -> str:
+    """Hash the contents of one or more files, reading them in 1 MiB chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        digest.update(b"\0")  # Keep file boundaries from shifting into each other
+    return digest.hexdigest()
+
+
+def count_examples(path: Path) -> int:
+    """Count the non-blank lines of a JSONL file, matching how examples are counted when read."""
+    with open(path, 'rb') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def link_or_copy(src: Path, dest: Path) -> None:
+    """Hard-link src to dest, copying instead when they are on different filesystems."""
+    # dest is already the link made by a previous run
+    if dest.exists() and dest.samefile(src):
+        return
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
 def prepare_mlx_dataset(
     input_path: Path,
     output_dir: Path,
     max_seq_length: int = 256
-) -> Optional[Tuple[Path, Path]]:
+) -> Optional[Tuple[Path, Path, int, int]]:
     """
     Prepare dataset for MLX fine-tuning with optimized formatting.
     
+    A valid.jsonl next to the input is used as the validation set instead of
+    splitting one off the input, and an unchanged input reuses the previous run's files.
+    
     Args:
         input_path: JSONL file with instruction-tuning data
         output_dir: Directory for train.jsonl and valid.jsonl
         max_seq_length: Maximum sequence length in tokens
     
     Returns:
-        Tuple of (train_path, valid_path) or None if failed
+        Tuple of (train_path, valid_path, train_count, valid_count) or None if failed
     """
     try:
         if not input_path.exists():
             print(f"✗ Dataset not found: {input_path}")
             return None
         
+        train_path = output_dir / "train.jsonl"
+        valid_path = output_dir / "valid.jsonl"
+        
+        # A valid.jsonl in the output directory is this script's own earlier split, not
+        # a user-supplied validation set, so it must not replace a fresh 90/10 split
+        external_valid = input_path.parent / "valid.jsonl"
+        if (not external_valid.is_file()
+                or external_valid.samefile(input_path)
+                or input_path.parent.resolve() == output_dir.resolve()
+                or external_valid.resolve() == valid_path.resolve()):
+            external_valid = None
+        
+        # Skip parsing and rewriting entirely when the inputs match the last prepared run;
+        # the split mode is part of the key so a linked and a split run never share a hash
+        hash_path = output_dir / DATASET_HASH_FILE
+        if external_valid:
+            dataset_hash = "linked:" + hash_files(input_path, external_valid)
+        else:
+            dataset_hash = "split:" + hash_files(input_path)
+        try:
+            with open(hash_path, 'r') as f:
+                cached = json.load(f)
+            if cached["hash"] == dataset_hash and train_path.is_file() and valid_path.is_file():
+                print(f"✓ Dataset unchanged since last run, reusing {output_dir}")
+                return (train_path, valid_path, cached["train_count"], cached["valid_count"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
         print(f"Reading dataset: {input_path}...", end=" ", flush=True)
         
+        # Valid lines are kept as raw bytes; parsing only checks them, so nothing is
+        # re-serialized and the splits are written without a decode/encode round trip
         examples = []
-        with open(input_path, 'r', encoding='utf-8') as f:
+        with open(input_path, 'rb') as f:
             for line in f:
                 if line.strip():
                     try:
-                        examples.append(json.loads(line))
+                        loads_json(line)
                     except json.JSONDecodeError:
                         continue
+                    examples.append(line if line.endswith(b'\n') else line + b'\n')
         
         if not examples:
             print(f"✗\nNo valid examples in dataset")
@@ -125,33 +358,46 @@ def prepare_mlx_dataset(
         # Create output directory
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        # Split into train/validation (90/10)
-        split_idx = int(len(examples) * 0.9)
-        train_examples = examples[:split_idx]
-        valid_examples = examples[split_idx:]
+        # Invalidate the previous run's hash until both files are fully written
+        hash_path.unlink(missing_ok=True)
         
-        # Ensure we have validation data
-        if not valid_examples:
-            valid_examples = train_examples[-max(1, len(train_examples) // 10):]
-            train_examples = train_examples[:-max(1, len(train_examples) // 10)]
+        if external_valid:
+            # The input already has its own validation set, so all of it is training data
+            train_examples = examples
+        else:
+            # Split into train/validation (90/10)
+            split_idx = int(len(examples) * 0.9)
+            train_examples = examples[:split_idx]
+            valid_examples = examples[split_idx:]
+            
+            # Ensure we have validation data
+            if not valid_examples:
+                valid_examples = train_examples[-max(1, len(train_examples) // 10):]
+                train_examples = train_examples[:-max(1, len(train_examples) // 10)]
         
         # Write in MLX format
-        train_path = output_dir / "train.jsonl"
-        valid_path = output_dir / "valid.jsonl"
-        
         print(f"Writing training data: {train_path}...", end=" ", flush=True)
-        with open(train_path, 'w', encoding='utf-8') as f:
-            for ex in train_examples:
-                f.write(json.dumps(ex) + '\n')
+        with open(train_path, 'wb') as f:
+            f.writelines(train_examples)
         print(f"✓ ({len(train_examples)} examples)")
         
-        print(f"Writing validation data: {valid_path}...", end=" ", flush=True)
-        with open(valid_path, 'w', encoding='utf-8') as f:
-            for ex in valid_examples:
-                f.write(json.dumps(ex) + '\n')
-        print(f"✓ ({len(valid_examples)} examples)")
+        if external_valid:
+            print(f"Linking validation data: {external_valid}...", end=" ", flush=True)
+            link_or_copy(external_valid, valid_path)
+            valid_count = count_examples(valid_path)
+        else:
+            print(f"Writing validation data: {valid_path}...", end=" ", flush=True)
+            # Replace rather than truncate, in case valid.jsonl is a hard link to a user's file
+            valid_path.unlink(missing_ok=True)
+            with open(valid_path, 'wb') as f:
+                f.writelines(valid_examples)
+            valid_count = len(valid_examples)
+        print(f"✓ ({valid_count} examples)")
+        
+        with open(hash_path, 'w') as f:
+            json.dump({"hash": dataset_hash, "train_count": len(train_examples), "valid_count": valid_count}, f)
         
-        return (train_path, valid_path)
+        return (train_path, valid_path, len(train_examples), valid_count)
         
     except Exception as e:
         print(f"✗\nError preparing dataset: {e}")
@@ -160,6 +406,32 @@ def prepare_mlx_dataset(
         return None
 
 
+def stream_training_output(process: subprocess.Popen) -> bool:
+    """
+    Echo a child's output as it arrives and stop the child on an out-of-memory error.
+    
+    Output is relayed in raw chunks rather than lines so progress bars that
+    redraw with carriage returns still render live.
+    
+    Returns:
+        True if an out-of-memory error was seen, False otherwise
+    """
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    fd = process.stdout.fileno()
+    tail = b""
+    while chunk := os.read(fd, 65536):
+        out.write(chunk)
+        out.flush()
+        # Keep the end of the previous chunk so a marker split across reads still matches
+        window = tail + chunk.lower()
+        if any(pattern in window for pattern in OOM_PATTERNS):
+            process.terminate()
+            return True
+        tail = window[-32:]
+    return False
+
+
 def run_mlx_training(
     model_name: str,
     data_dir: Path,
@@ -181,21 +453,42 @@ def run_mlx_training(
     
     log_step("MLX LoRA Fine-Tuning Configuration")
     
+    # Smaller, narrower adapters halve LoRA parameters and activation memory
+    requested_rank = config['lora_rank']
+    if config.get('low_memory'):
+        config['lora_rank'] = min(config['lora_rank'], LOW_MEMORY_LORA_RANK)
+    
     print(f"Model: {model_name}")
     print(f"Batch size: {config['batch_size']}")
     print(f"Max sequence length: {config['max_seq_length']}")
     print(f"Learning rate: {config['learning_rate']}")
     print(f"Epochs: {config['epochs']}")
+    # Accumulate gradients to reach the requested effective batch without its memory cost
+    grad_accum_steps = 1
+    if config.get('effective_batch_size'):
+        grad_accum_steps = max(1, -(-config['effective_batch_size'] // config['batch_size']))
+    if grad_accum_steps > 1:
+        print(f"Gradient accumulation: {grad_accum_steps} steps "
+              f"(effective batch size {grad_accum_steps * config['batch_size']})")
     print(f"LoRA rank: {config['lora_rank']}")
     print(f"LoRA alpha: {config['lora_alpha']}")
     print(f"LoRA dropout: {config['lora_dropout']:.2f}")
+    if config.get('q_bits'):
+        print(f"Quantization: {config['q_bits']}-bit (QLoRA)")
+    if config.get('optimizer'):
+        print(f"Optimizer: {config['optimizer']}")
     
     if config.get('low_memory'):
         print("\n🔧 LOW-MEMORY MODE ENABLED:")
         print("  - Gradient checkpointing: ON")
         print("  - Reduced batch size for GPU stability")
+        print(f"  - LoRA on {', '.join(LOW_MEMORY_LORA_KEYS)} only")
+        if config['lora_rank'] != requested_rank:
+            print(f"  - LoRA rank lowered from {requested_rank} to {config['lora_rank']}")
+        if config.get('q_bits'):
+            print(f"  - {config['q_bits']}-bit quantized base model")
     
-    # Ensure adapter output directory exists
+    # Ensure adapter output directory exists; parents=True also creates output_dir
     adapter_dir = output_dir / "adapters"
     adapter_dir.mkdir(parents=True, exist_ok=True)
     
@@ -210,14 +503,25 @@ def run_mlx_training(
             'scale': lora_scale,
         },
     }
+    if config.get('low_memory'):
+        lora_yaml_config['lora_parameters']['keys'] = LOW_MEMORY_LORA_KEYS
+    if config.get('optimizer'):
+        lora_yaml_config['optimizer'] = config['optimizer']
+    if grad_accum_steps > 1:
+        lora_yaml_config['grad_accumulation_steps'] = grad_accum_steps
     
     # Write LoRA config to a temporary YAML file
     config_path = output_dir / "lora_config.yaml"
-    config_path.parent.mkdir(parents=True, exist_ok=True)
     with open(config_path, 'w') as f:
-        yaml.dump(lora_yaml_config, f, default_flow_style=False)
+        yaml.dump(lora_yaml_config, f, Dumper=SafeDumper, default_flow_style=False)
     print(f"\nLoRA config written to: {config_path}")
     
+    report_steps = max(10, config['total_iters'] // 10)
+    # More validation batches than the validation set holds just re-evaluates the same rows
+    val_batches = max(10, config['total_iters'] // 20)
+    if config.get('num_valid'):
+        val_batches = min(val_batches, max(1, config['num_valid'] // config['batch_size']))
+    
     # Build MLX training command
     # mlx_lm lora expects the data directory to contain train.jsonl and valid.jsonl
     cmd = [
@@ -227,9 +531,9 @@ def run_mlx_training(
         "--data", str(data_dir),
         "--adapter-path", str(adapter_dir),
         "--iters", str(config['total_iters']),
-        "--steps-per-report", str(max(10, config['total_iters'] // 10)),
-        "--steps-per-eval", str(max(10, config['total_iters'] // 10)),
-        "--val-batches", str(max(10, config['total_iters'] // 20)),
+        "--steps-per-report", str(report_steps),
+        "--steps-per-eval", str(report_steps),
+        "--val-batches", str(val_batches),
         "--batch-size", str(config['batch_size']),
         "--learning-rate", str(config['learning_rate']),
         "--max-seq-length", str(config['max_seq_length']),
@@ -251,13 +555,24 @@ def run_mlx_training(
     env = os.environ.copy()
     env['PYTHONUNBUFFERED'] = '1'
     env['MLX_GPU_MEMORY_FRACTION'] = '0.85'  # Conservative GPU memory use
+    env['MLX_METAL_FAST_SYNCH'] = '1'  # Cheaper CPU/GPU synchronization between kernels
     env['TOKENIZERS_PARALLELISM'] = '0'  # Avoid deadlocks
     
     # Run training
     try:
-        result = subprocess.run(cmd, env=env, timeout=None)
+        with subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+            out_of_memory = stream_training_output(process)
+            returncode = process.wait()
         
-        if result.returncode == 0:
+        # Retry at half the batch size rather than making the user rerun the whole pipeline
+        if out_of_memory and config['batch_size'] > 1:
+            batch_size = config['batch_size'] // 2
+            log_section(f"⚠️  Out of GPU memory; retrying with batch size {batch_size}")
+            iters_per_epoch = max(10, (config['num_samples'] + batch_size - 1) // batch_size)
+            retry_config = dict(config, batch_size=batch_size, total_iters=iters_per_epoch * config['epochs'])
+            return run_mlx_training(model_name, data_dir, output_dir, retry_config)
+        
+        if returncode == 0:
             log_section("✓ Fine-Tuning Completed Successfully")
             print(f"\n📁 Adapters saved to: {adapter_dir}")
             print(f"\nNext steps:")
@@ -267,7 +582,10 @@ def run_mlx_training(
             return True
         else:
             log_section("✗ Fine-Tuning Failed")
-            print(f"\nExit code: {result.returncode}")
+            if out_of_memory:
+                print("\nStopped after an out-of-memory error at batch size 1")
+            else:
+                print(f"\nExit code: {returncode}")
             print("\n🔧 Troubleshooting tips:")
             print(f"\n1. GPU Memory Error?")
             print(f"   - Further reduce batch size: --batch-size 1")
@@ -307,6 +625,9 @@ Examples:
   
   # Ultra low memory (very tight constraints)
   python3 run_finetuning_mlx.py --model Qwen/Qwen2.5-Coder-7B-Instruct --ultra-low-memory
+  
+  # 4-bit QLoRA at the standard batch size
+  python3 run_finetuning_mlx.py --model Qwen/Qwen2.5-Coder-7B-Instruct --quantize
         """
     )
     
@@ -360,12 +681,48 @@ Examples:
     parser.add_argument(
         "--low-memory",
         action="store_true",
-        help="Enable low-memory mode (batch_size=1, seq_length=256)",
+        help="Enable low-memory mode (batch_size=1, seq_length=256, quantized weights, LoRA rank <= 4 on q/v projections)",
     )
     parser.add_argument(
         "--ultra-low-memory",
         action="store_true",
-        help="Ultra-low memory mode (batch_size=1, seq_length=128, gradient checkpointing)",
+        help="Ultra-low memory mode (batch_size=1, seq_length=128, gradient checkpointing, quantized weights, LoRA rank <= 4 on q/v projections)",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="Train on a quantized copy of the model (QLoRA); on by default in low-memory modes",
+    )
+    parser.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="Train on full-precision weights even in low-memory modes",
+    )
+    parser.add_argument(
+        "--q-bits",
+        type=int,
+        choices=[4, 8],
+        default=4,
+        help="Bits per weight when quantizing (default: 4)",
+    )
+    parser.add_argument(
+        "--effective-batch-size",
+        type=int,
+        default=None,
+        help="Target batch size reached by accumulating gradients over several "
+             "--batch-size steps (default: no accumulation)",
+    )
+    parser.add_argument(
+        "--optimizer",
+        choices=["adam", "adamw", "adafactor"],
+        default=None,
+        help="Optimizer for mlx_lm (default: mlx_lm's own); adafactor keeps factored "
+             "second moments and uses the least optimizer-state memory",
+    )
+    parser.add_argument(
+        "--raise-memory-limit",
+        action="store_true",
+        help="Raise the macOS GPU wired-memory limit to 90%% of RAM (needs passwordless sudo)",
     )
     parser.add_argument(
         "--dataset",
@@ -395,12 +752,16 @@ Examples:
         low_memory = True
         print("⚠️  LOW-MEMORY MODE ENABLED\n")
     
+    # Quantized weights are the largest memory saving, so low-memory modes use them by default
+    quantize = (args.quantize or low_memory) and not args.no_quantize
+    
     log_section("MLX Fine-Tuning for Apple Silicon")
     
     # Verify MLX is installed
     log_step("Environment Check")
     if not check_mlx_installed():
         sys.exit(1)
+    raise_wired_limit(args.raise_memory_limit)
     
     # Verify model is available
     if not check_model_available(args.model):
@@ -423,18 +784,23 @@ Examples:
     if result is None:
         sys.exit(1)
     
-    train_path, valid_path = result
+    # The preparation step already counted the training rows; no need to re-read them
+    train_path, valid_path, num_samples, num_valid = result
+    
+    # Quantize the base model once; later runs reuse the cached copy
+    training_model = args.model
+    if quantize:
+        log_step("Model Quantization")
+        quantized = quantize_model(args.model, output_dir / "quantized", args.q_bits)
+        if quantized is None:
+            print("⚠️  Continuing with the full-precision model")
+            quantize = False
+        else:
+            training_model = quantized
     
     # Prepare training config
     log_step("Training Configuration")
     
-    # Estimate iterations per epoch from training data
-    try:
-        with open(train_path, 'r') as f:
-            num_samples = sum(1 for line in f if line.strip())
-    except:
-        num_samples = 1000  # Conservative estimate
-    
     iters_per_epoch = max(10, (num_samples + batch_size - 1) // batch_size)
     total_iters = iters_per_epoch * args.epochs
     
@@ -444,17 +810,22 @@ Examples:
         'learning_rate': args.learning_rate,
         'epochs': args.epochs,
         'total_iters': total_iters,
+        'num_samples': num_samples,
+        'num_valid': num_valid,
+        'effective_batch_size': args.effective_batch_size,
         'lora_rank': args.lora_rank,
         'lora_alpha': args.lora_alpha,
         'lora_dropout': args.lora_dropout,
         'low_memory': low_memory,
+        'q_bits': args.q_bits if quantize else None,
+        'optimizer': args.optimizer,
     }
     
     print(f"Training samples: {num_samples}")
     print(f"Iterations per epoch: {iters_per_epoch}")
     
     # Run training
-    success = run_mlx_training(args.model, data_dir, output_dir, config)
+    success = run_mlx_training(training_model, data_dir, output_dir, config)
     
     sys.exit(0 if success else 1)
 
@@ -8,13 +8,14 @@ This script checks your environment and ensures all necessary packages are avail
 
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
-def run_command(cmd: list) -> tuple[bool, str]:
+def run_command(cmd: list, timeout: int = 30) -> tuple[bool, str]:
     """Run a shell command and return success status and output."""
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
         return result.returncode == 0, result.stdout + result.stderr
     except subprocess.TimeoutExpired:
         return False, "Command timeout"
@@ -45,7 +46,9 @@ def check_package(package_name: str, import_name: str = None) -> bool:
     try:
         __import__(import_name)
         return True
-    except ImportError:
+    except Exception:
+        # Checks run on worker threads, so a module that fails to initialise
+        # (not just one that is absent) must not escape and abort setup
         return False
 
 
@@ -68,6 +71,21 @@ def install_package(package_name: str, version: str = None) -> bool:
         return False
 
 
+def install_packages(package_names: list) -> bool:
+    """Install several packages with a single pip run."""
+    print(f"  Installing {', '.join(package_names)}...", end=" ", flush=True)
+    
+    cmd = [sys.executable, "-m", "pip", "install", "--quiet", "--upgrade", *package_names]
+    # One resolver run for everything; allow it the time several installs need
+    success, output = run_command(cmd, timeout=30 * len(package_names))
+    if success:
+        print("✓")
+        return True
+    else:
+        print(f"✗\n    {output}")
+        return False
+
+
 def main():
     print("\n" + "=" * 70)
     print("MLX Fine-Tuning Environment Setup")
@@ -93,9 +111,14 @@ def main():
     
     missing_packages = []
     
-    for package_name, import_name in packages.items():
+    # Imports spend much of their time loading shared libraries and files, so
+    # check all packages at once; results are still reported in order
+    with ThreadPoolExecutor(max_workers=len(packages)) as executor:
+        installed = list(executor.map(check_package, packages.keys(), packages.values()))
+    
+    for package_name, is_installed in zip(packages, installed):
         print(f"Checking {package_name}...", end=" ", flush=True)
-        if check_package(package_name, import_name):
+        if is_installed:
             print("✓")
         else:
             print("✗ (missing)")
@@ -107,9 +130,14 @@ def main():
         print("-" * 70 + "\n")
         
         failed = []
-        for package in missing_packages:
-            if not install_package(package):
-                failed.append(package)
+        # One pip run pays interpreter and resolver start-up once; only if it
+        # fails fall back to per-package installs to find the culprit(s)
+        if len(missing_packages) == 1 or not install_packages(missing_packages):
+            if len(missing_packages) > 1:
+                print("\n  Batch install failed; installing packages one at a time...")
+            for package in missing_packages:
+                if not install_package(package):
+                    failed.append(package)
         
         if failed:
             print(f"\n✗ Failed to install: {', '.join(failed)}")